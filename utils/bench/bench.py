@@ -0,0 +1,423 @@
+# ===============================================================================
+# @file:    bench.py
+# @note:    Benchmark of utility tools
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Generates synthetic HEX/BIN images with valid image header and
+#           project informations and measures header decode, build info
+#           extraction, image verification and project info generation.
+#
+#           Each case runs in separate process, so peak RSS is measured
+#           per case. Results can be stored as baseline and compared
+#           against in later runs.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+import os
+import json
+import time
+import random
+import argparse
+import binascii
+import resource
+import tempfile
+import subprocess
+
+# Utility tools sources
+SRC_DIR = os.path.join( os.path.dirname( os.path.abspath( __file__ )), "..", "src" )
+sys.path.insert( 0, SRC_DIR )
+
+from image_header import ImageHeader, HEADER_SIZE, IMAGE_TYPE_APP, ENC_TYPE_NONE, SIG_TYPE_NONE, calc_header_crc
+from image_integrity import calc_image_digest
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# ===============================================================================
+#       BENCHMARK SETTINGS
+# ===============================================================================
+
+# Image sizes
+# Unit: byte
+BENCH_SIZES = ( 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024 )
+
+# Image file formats
+BENCH_FORMATS = ( "hex", "bin" )
+
+# Benchmark cases, "proj-info" does not depend on image
+BENCH_IMAGE_CASES   = ( "decode", "build-info", "verify" )
+BENCH_CASES         = BENCH_IMAGE_CASES + ( "proj-info", "startup" )
+
+# Start-up measured commands of "revision.py" entry point
+BENCH_STARTUP_COMMANDS = ( [ "--version" ], [ "analyze", "-v" ], [ "stamp", "-h" ], [ "proj-info", "-h" ] )
+
+# Image location, project info is placed at the end of image
+BENCH_BASE_ADDR     = 0x08000000
+BENCH_HEADER_ADDR   = BENCH_BASE_ADDR
+
+# Size of project info section
+# NOTE: Must match hex_analyzer "PROJ_INFO_STRING_SIZE"!
+# Unit: byte
+BENCH_PROJ_INFO_SIZE = 2048
+
+# Number of data bytes per Intel HEX record
+BENCH_HEX_RECORD_SIZE = 16
+
+# Number of repetitions, best time is reported
+BENCH_REPEAT = 3
+
+# Allowed slowdown against baseline
+# Unit: %
+BENCH_THRESHOLD = 20.0
+
+# Min. time difference reported as regression, ignores noise of short cases
+# Unit: s
+BENCH_MIN_DELTA = 1e-3
+
+# Tool description
+TOOL_DESCRIPTION = \
+"Utility Tools Benchmark %s" % SCRIPT_VER
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief:   Argument parser
+#
+# @return:       Dictionary of arguments
+# ===============================================================================
+def arg_parser():
+
+    # Arg parser
+    parser = argparse.ArgumentParser( 	description=TOOL_DESCRIPTION,
+                                        epilog="Enjoy the program!")
+
+    # Add arguments
+    parser.add_argument("-s",   help="image sizes in kB",                   metavar="size",         type=int,   nargs="+",   required=False,  default=[ size // 1024 for size in BENCH_SIZES ] )
+    parser.add_argument("-fmt", help="image formats",                       choices=BENCH_FORMATS,              nargs="+",   required=False,  default=list( BENCH_FORMATS ))
+    parser.add_argument("-cs",  help="benchmark cases",                     choices=BENCH_CASES,                nargs="+",   required=False,  default=list( BENCH_CASES ))
+    parser.add_argument("-r",   help="number of repetitions",               metavar="repeat",       type=int,                required=False,  default=BENCH_REPEAT )
+    parser.add_argument("-w",   help="work directory of generated images",  metavar="work_dir",     type=str,                required=False,  default=os.path.join( tempfile.gettempdir(), "revision_bench" ))
+    parser.add_argument("-o",   help="store results as baseline",           metavar="out_file",     type=str,                required=False )
+    parser.add_argument("-bl",  help="compare results with baseline",       metavar="baseline",     type=str,                required=False )
+    parser.add_argument("-th",  help="allowed slowdown against baseline in %%", metavar="threshold", type=float,             required=False,  default=BENCH_THRESHOLD )
+
+    # Internal: run single case in child process
+    parser.add_argument("-run", help=argparse.SUPPRESS,                     nargs=3,                                 required=False )
+
+    # Get args
+    return vars( parser.parse_args() )
+
+# ===============================================================================
+# @brief: Create project info string as stored in image
+#
+# @param[in]:    git_info   - Git informations
+# @return:       Project info bytes, NULL terminated
+# ===============================================================================
+def create_proj_info_block(git_info):
+    from proj_info import create_build_info, NEWLINE
+
+    build_info = create_build_info( "bench_project", "Release", "bench_pc", "Linux", git_info )
+
+    # Generated string is C escaped
+    return build_info.replace( NEWLINE, "\r\n" ).encode( "utf-8" ) + b"\0"
+
+# ===============================================================================
+# @brief: Write Intel HEX file
+#
+# @param[in]:    file       - Output file
+# @param[in]:    addr       - Address of first byte
+# @param[in]:    data       - Image data
+# @return:       void
+# ===============================================================================
+def write_hex_file(file, addr, data):
+    lines   = []
+    page    = None
+
+    for idx in range( 0, len(data), BENCH_HEX_RECORD_SIZE ):
+        rec_addr = addr + idx
+
+        # Extended linear address record
+        if ( rec_addr >> 16 ) != page:
+            page = rec_addr >> 16
+            rec  = bytes([ 2, 0, 0, 4, page >> 8, page & 0xFF ])
+            lines.append( b":" + binascii.hexlify( rec + bytes([ -sum(rec) & 0xFF ])).upper() )
+
+        chunk   = data[idx:idx+BENCH_HEX_RECORD_SIZE]
+        rec     = bytes([ len(chunk), ( rec_addr >> 8 ) & 0xFF, rec_addr & 0xFF, 0 ]) + chunk
+        lines.append( b":" + binascii.hexlify( rec + bytes([ -sum(rec) & 0xFF ])).upper() )
+
+    lines.append( b":00000001FF" )
+
+    with open( file, "wb" ) as f:
+        f.write( b"\r\n".join( lines ) + b"\r\n" )
+
+# ===============================================================================
+# @brief: Generate synthetic image
+#
+#       Payload is pseudo-random and deterministic for given size. Image
+#       header holds valid size, CRC, hash and header CRC.
+#
+# @param[in]:    size   - Image size including header
+# @return:       Image data
+# ===============================================================================
+def generate_image(size):
+    git_info    = { "name": "bench", "email": "bench@example.com", "origin": "", "branch": "master", "commit_sha": "0123456" }
+    proj_info   = create_proj_info_block( git_info )
+
+    payload = bytearray( random.Random( size ).randbytes( size - HEADER_SIZE ))
+    payload[-BENCH_PROJ_INFO_SIZE:] = proj_info.ljust( BENCH_PROJ_INFO_SIZE, b"\0" )
+
+    header = ImageHeader({
+        "crc": 0, "ver": 1, "image_type": IMAGE_TYPE_APP, "ctrl_res": bytes(5),
+        "sw_ver": 0x00010000, "hw_ver": 0x00010000, "image_size": len(payload), "image_addr": 0,
+        "image_crc": 0, "enc_type": ENC_TYPE_NONE, "sig_type": SIG_TYPE_NONE, "signature": bytes(64),
+        "hash": bytes(32), "git_sha": bytes.fromhex( git_info["commit_sha"] + "0" ), "enc_image_crc": 0, "data_res": bytes(118),
+    })
+    header.image_crc, header.hash = calc_image_digest([ payload ])
+    header.crc = calc_header_crc( header.pack() )
+
+    return header.pack() + payload
+
+# ===============================================================================
+# @brief: Get synthetic image file, generated only if not yet present
+#
+# @param[in]:    work_dir   - Directory of generated images
+# @param[in]:    size       - Image size
+# @param[in]:    fmt        - File format, "hex" or "bin"
+# @return:       Image file path
+# ===============================================================================
+def get_image_file(work_dir, size, fmt):
+    file = os.path.join( work_dir, "image_%d.%s" % ( size, fmt ))
+
+    if not os.path.isfile( file ):
+        os.makedirs( work_dir, exist_ok=True )
+        data = generate_image( size )
+
+        if fmt == "hex":
+            write_hex_file( file + ".tmp", BENCH_BASE_ADDR, data )
+        else:
+            with open( file + ".tmp", "wb" ) as f:
+                f.write( data )
+
+        os.replace( file + ".tmp", file )
+
+    return file
+
+# ===============================================================================
+# @brief: Create throwaway git repository for project info generation
+#
+# @param[in]:    repo   - Repository directory
+# @return:       void
+# ===============================================================================
+def create_git_repo(repo):
+    for cmd in ( [ "init", "-q" ],
+                 [ "config", "user.name", "bench" ],
+                 [ "config", "user.email", "bench@example.com" ],
+                 [ "remote", "add", "origin", "https://example.com/bench.git" ],
+                 [ "commit", "-q", "--allow-empty", "-m", "bench" ] ):
+        subprocess.run( [ "git" ] + cmd, cwd=repo, check=True, stdout=subprocess.DEVNULL )
+
+# ===============================================================================
+# @brief: Get peak RSS of current process
+#
+#       "ru_maxrss" is inherited over fork, therefore high water mark of
+#       process memory map is used where available.
+#
+# @return:       Peak RSS in bytes
+# ===============================================================================
+def get_peak_rss():
+    try:
+        with open( "/proc/self/status", "r" ) as f:
+            for line in f:
+                if line.startswith( "VmHWM:" ):
+                    return int( line.split()[1] ) * 1024
+    except OSError:
+        pass
+
+    # Linux reports maximum RSS in kB, macOS in bytes
+    rss = resource.getrusage( resource.RUSAGE_SELF ).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+# ===============================================================================
+# @brief: Run benchmark case in current process
+#
+# @param[in]:    case   - Benchmark case
+# @param[in]:    target - Image file, or git repository for "proj-info"
+# @param[in]:    size   - Image size
+# @param[in]:    repeat - Number of repetitions
+# @return:       Best time in seconds
+# ===============================================================================
+def run_case(case, target, size, repeat):
+    from hex_analyzer import analyze_image
+    from image_reader import load_image
+    from image_integrity import verify_image
+
+    proj_info_addr = BENCH_BASE_ADDR + size - BENCH_PROJ_INFO_SIZE
+
+    def decode():
+        analyze_image( target, BENCH_HEADER_ADDR, None, BENCH_BASE_ADDR )
+
+    def build_info():
+        analyze_image( target, BENCH_HEADER_ADDR, proj_info_addr, BENCH_BASE_ADDR )
+
+    def verify():
+        with load_image( target, BENCH_BASE_ADDR ) as image:
+            if not verify_image( image, BENCH_HEADER_ADDR )["valid"]:
+                raise RuntimeError("%s: verification failed" % target)
+
+    def proj_info():
+        import proj_info
+
+        os.chdir( target )
+        git_info    = proj_info.get_git_info()
+        build_info  = proj_info.create_build_info( "bench", "Release", "bench_pc", "Linux", git_info )
+        fields      = proj_info.create_template_fields( build_info, "bench", "Release", "bench_pc", "Linux", git_info )
+        proj_info.write_proj_info( "proj_info.c", fields, force_write=True )
+
+    func = { "decode": decode, "build-info": build_info, "verify": verify, "proj-info": proj_info }[case]
+
+    best = None
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min( best, elapsed )
+
+    return best
+
+# ===============================================================================
+# @brief: Run benchmark case in child process
+#
+# @param[in]:    case   - Benchmark case
+# @param[in]:    target - Image file, or git repository for "proj-info"
+# @param[in]:    size   - Image size
+# @param[in]:    repeat - Number of repetitions
+# @return:       Tuple of (best time in seconds, peak RSS in bytes)
+# ===============================================================================
+def run_case_isolated(case, target, size, repeat):
+    proc = subprocess.run( [ sys.executable, os.path.abspath( __file__ ), "-r", str(repeat), "-run", case, target, str(size) ],
+                           stdout=subprocess.PIPE, check=True )
+    result = json.loads( proc.stdout )
+
+    return result["time"], result["rss"]
+
+# ===============================================================================
+# @brief: Measure start-up time of command
+#
+#       Whole process lifetime is measured, including interpreter start-up.
+#
+# @param[in]:    args   - Arguments of "revision.py"
+# @param[in]:    repeat - Number of repetitions
+# @return:       Best time in seconds
+# ===============================================================================
+def measure_startup(args, repeat):
+    cmd  = [ sys.executable, os.path.join( SRC_DIR, "revision.py" ) ] + args
+    best = None
+
+    for _ in range( repeat ):
+        start = time.perf_counter()
+        subprocess.run( cmd, check=True, stdout=subprocess.DEVNULL )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min( best, elapsed )
+
+    return best
+
+# ===============================================================================
+# @brief: Print results table
+#
+# @param[in]:    results    - Dictionary of results
+# @param[in]:    baseline   - Dictionary of baseline results, None if not used
+# @param[in]:    threshold  - Allowed slowdown in %
+# @return:       Number of regressions
+# ===============================================================================
+def print_results(results, baseline, threshold):
+    regressions = 0
+
+    print("")
+    print("%-24s %10s %10s %10s %10s" % ( "Case", "Time [ms]", "MB/s", "RSS [MB]", "Baseline" ))
+    print("-" * 68)
+
+    for key, result in results.items():
+        speed   = "%.1f" % ( result["size"] / result["time"] / 1e6 ) if result["size"] else "-"
+        delta   = ""
+
+        if baseline is not None and key in baseline:
+            change = ( result["time"] / baseline[key]["time"] - 1.0 ) * 100.0
+            delta  = "%+.1f%%" % change
+            if change > threshold and result["time"] - baseline[key]["time"] > BENCH_MIN_DELTA:
+                delta += " !"
+                regressions += 1
+
+        rss = "%.1f" % ( result["rss"] / 1e6 ) if result["rss"] else "-"
+        print("%-24s %10.2f %10s %10s %10s" % ( key, result["time"] * 1e3, speed, rss, delta ))
+
+    return regressions
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+    args = arg_parser()
+
+    # Child process
+    if args["run"] is not None:
+        case, target, size = args["run"]
+        time_s = run_case( case, target, int( size ), args["r"] )
+
+        print( json.dumps({ "time": time_s, "rss": get_peak_rss() }))
+        return
+
+    results = {}
+
+    for case in args["cs"]:
+        if case == "proj-info":
+            os.makedirs( args["w"], exist_ok=True )
+            with tempfile.TemporaryDirectory( prefix="git_", dir=args["w"] ) as repo:
+                create_git_repo( repo )
+                time_s, rss = run_case_isolated( case, repo, 0, args["r"] )
+            results[case] = { "time": time_s, "rss": rss, "size": 0 }
+            continue
+
+        if case == "startup":
+            for cmd in BENCH_STARTUP_COMMANDS:
+                results["startup/%s" % cmd[0].lstrip( "-" )] = { "time": measure_startup( cmd, max( args["r"], 5 )), "rss": None, "size": 0 }
+            continue
+
+        for fmt in args["fmt"]:
+            for size in args["s"]:
+                file = get_image_file( args["w"], size * 1024, fmt )
+                time_s, rss = run_case_isolated( case, file, size * 1024, args["r"] )
+                results["%s/%s/%dk" % ( case, fmt, size )] = { "time": time_s, "rss": rss, "size": size * 1024 }
+
+    baseline = None
+    if args["bl"] is not None:
+        with open( args["bl"], "r" ) as f:
+            baseline = json.load( f )
+
+    regressions = print_results( results, baseline, args["th"] )
+
+    if args["o"] is not None:
+        with open( args["o"], "w" ) as f:
+            json.dump( results, f, indent=4 )
+
+    sys.exit( 1 if regressions else 0 )
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,228 @@
+# ===============================================================================
+# @file:    crc8.py
+# @note:    Table driven CRC8 calculation
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   CRC8 with configurable polynomial and seed. Lookup table is
+#           precomputed once per configuration.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+import argparse
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# ===============================================================================
+#       CRC8 SETTINGS
+# ===============================================================================
+
+# Firmware CRC8 settings
+# NOTE: Must match bootloader calculation!
+CRC8_POLY = 0x07
+CRC8_SEED = 0xB6
+
+# ------------------------------------------------------------------------
+#   Test vectors
+#
+#   Format: ( polynomial, seed, data, expected CRC )
+# ------------------------------------------------------------------------
+CRC8_TEST_VECTORS = (
+
+    # Catalogue check values
+    ( 0x07, 0x00, b"123456789",     0xF4 ),     # CRC-8/SMBUS
+    ( 0x9B, 0xFF, b"123456789",     0xDA ),     # CRC-8/CDMA2000
+    ( 0xD5, 0x00, b"123456789",     0xBC ),     # CRC-8/DVB-S2
+    ( 0x9B, 0x00, b"123456789",     0xEA ),     # CRC-8/LTE
+    ( 0x1D, 0xFD, b"123456789",     0x7E ),     # CRC-8/I-CODE
+
+    # Firmware settings
+    ( CRC8_POLY, CRC8_SEED, b"",                0xB6 ),
+    ( CRC8_POLY, CRC8_SEED, b"\x00",            0x0B ),
+    ( CRC8_POLY, CRC8_SEED, b"123456789",       0x59 ),
+    ( CRC8_POLY, CRC8_SEED, bytes(255),         0x0B ),
+    ( CRC8_POLY, CRC8_SEED, b"\xFF" * 255,      0xF8 ),
+    ( CRC8_POLY, CRC8_SEED, bytes(range(256)),  0x25 ),
+)
+
+# Tool description
+TOOL_DESCRIPTION = \
+"CRC8 Calculation Tool %s" % SCRIPT_VER
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Reference bitwise CRC8 calculation
+#
+#       Same algorithm as in firmware, used only for validation of
+#       table driven calculation.
+#
+# @param[in]:    data   - Input data
+# @param[in]:    poly   - CRC polynomial
+# @param[in]:    seed   - CRC initial value
+# @return:       CRC8 value
+# ===============================================================================
+def calc_crc8_bitwise(data, poly=CRC8_POLY, seed=CRC8_SEED):
+    crc = seed
+
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            if crc & 0x80:
+                crc = (( crc << 1 ) ^ poly ) & 0xFF
+            else:
+                crc = ( crc << 1 ) & 0xFF
+
+    return crc
+
+# ===============================================================================
+# @brief: Get CRC8 calculator for specific settings
+#
+#       Calculators are cached, so tables are built only once.
+#
+# @param[in]:    poly   - CRC polynomial
+# @param[in]:    seed   - CRC initial value
+# @return:       CRC8 calculator
+# ===============================================================================
+def get_crc8(poly=CRC8_POLY, seed=CRC8_SEED):
+    key = ( poly, seed )
+    if key not in _crc8_cache:
+        _crc8_cache[key] = Crc8( poly, seed )
+    return _crc8_cache[key]
+
+# ===============================================================================
+# @brief: Calculate CRC8
+#
+# @param[in]:    data   - Input data
+# @param[in]:    poly   - CRC polynomial
+# @param[in]:    seed   - CRC initial value
+# @return:       CRC8 value
+# ===============================================================================
+def calc_crc8(data, poly=CRC8_POLY, seed=CRC8_SEED):
+    return get_crc8( poly, seed ).calc( data )
+
+# ===============================================================================
+# @brief: Run test vectors
+#
+#       Each vector is checked against table driven and reference bitwise
+#       calculation.
+#
+# @return:       Number of failed test vectors
+# ===============================================================================
+def run_self_test():
+    failed = 0
+
+    for poly, seed, data, expected in CRC8_TEST_VECTORS:
+        crc8    = get_crc8( poly, seed )
+        results = ( crc8.calc( data ), calc_crc8_bitwise( data, poly, seed ))
+
+        if any( result != expected for result in results ):
+            failed += 1
+            print("FAIL: poly=0x%02X seed=0x%02X len=%d expected=0x%02X got=%s" %
+                  ( poly, seed, len(data), expected, ", ".join( "0x%02X" % result for result in results )))
+
+    print("CRC8 self-test: %d/%d passed" % ( len(CRC8_TEST_VECTORS) - failed, len(CRC8_TEST_VECTORS) ))
+
+    return failed
+
+# ===============================================================================
+# @brief:   Argument parser
+#
+# @return:       Dictionary of arguments
+# ===============================================================================
+def arg_parser():
+
+    # Arg parser
+    parser = argparse.ArgumentParser( 	description=TOOL_DESCRIPTION,
+                                        epilog="Enjoy the program!")
+
+    # Add arguments
+    parser.add_argument("-t",   help="run test vectors",            action="store_true",                      required=False )
+    parser.add_argument("-d",   help="data as hex string",          metavar="data",       type=str,           required=False )
+    parser.add_argument("-p",   help="polynomial",                  metavar="poly",       type=str,           required=False,  default="%02X" % CRC8_POLY )
+    parser.add_argument("-s",   help="seed",                        metavar="seed",       type=str,           required=False,  default="%02X" % CRC8_SEED )
+
+    # Get args
+    return vars( parser.parse_args() )
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+    args = arg_parser()
+
+    if args["t"]:
+        sys.exit( 1 if run_self_test() else 0 )
+
+    if args["d"] is not None:
+        print("0x%02X" % calc_crc8( bytes.fromhex( args["d"] ), int( args["p"], 16 ), int( args["s"], 16 )))
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: CRC8 calculator
+#
+#       Table holds CRC of each byte value, so single table lookup per
+#       input byte is needed.
+#
+# @note:    Slicing-by-N was measured slower than single table lookup in
+#           CPython, as interpreter overhead dominates over lookups.
+# ===============================================================================
+class Crc8:
+
+    def __init__(self, poly=CRC8_POLY, seed=CRC8_SEED):
+        self.poly   = poly
+        self.seed   = seed
+        self.table  = bytes( calc_crc8_bitwise( bytes([ idx ]), poly, 0 ) for idx in range(256) )
+
+    # ===============================================================================
+    # @brief: Calculate CRC8
+    #
+    # @param[in]:    data   - Input data
+    # @param[in]:    crc    - Initial value, None for seed
+    # @return:       CRC8 value
+    # ===============================================================================
+    def calc(self, data, crc=None):
+        table   = self.table
+        crc     = self.seed if crc is None else crc
+
+        for byte in data:
+            crc = table[crc ^ byte]
+
+        return crc
+
+    # ===============================================================================
+    # @brief: Calculate CRC8 of multiple buffers
+    #
+    # @param[in]:    bufs   - Iterable of input buffers
+    # @return:       List of CRC8 values
+    # ===============================================================================
+    def calc_many(self, bufs):
+        return [ self.calc( buf ) for buf in bufs ]
+
+
+# Cache of CRC8 calculators
+_crc8_cache = {}
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -13,7 +13,17 @@ import sys
 import os
 
 import argparse
-from intelhex import IntelHex
+
+import timings
+
+from image_reader import open_image, load_image, ImageError
+from image_integrity import verify_image, IMAGE_FILL_BYTE
+from image_diff import diff_images
+from image_discovery import discover_image
+from image_signature import ImageSignatureError
+from image_encryption import ImageEncryptionError
+from image_header import ImageHeader, LegacyImageHeader, ImageHeaderError, HEADER_SIZE, LEGACY_HEADER_SIZE, \
+                         IMAGE_TYPE_NAMES, ENC_TYPE_NAMES, SIG_TYPE_NAMES, ver_to_str, check_header_crc, get_image_start
 
 # ===============================================================================
 #       SCRIPT VERSIONING
@@ -23,32 +33,28 @@ SCRIPT_VER = "V0.0.1"
 # HEX file endiannes
 HEX_FILE_LITTLE_ENDIAN = True
 
-# ===============================================================================
-#       APPLICATION HEADER SETTINGS
-# ===============================================================================
-
-# Application header size
-APP_HEADER_SIZE = 16
-
-# ------------------------------------------------------------------------
-#   Application header location offset realtive to inputed values
-# ------------------------------------------------------------------------
-
-# Application header signature offset
-APP_HEADER_SIGNATURE_OFFSET     = 0
-
-# Application header bytes offset
-APP_HEADER_SW_MAJOR_OFFSET      = 4
-APP_HEADER_SW_MINOR_OFFSET      = 5
-APP_HEADER_SW_DEVELOP_OFFSET    = 6
-APP_HEADER_SW_TEST_OFFSET       = 7
-
-# Application CRC and size
-APP_HEADER_SIZE_OFFSET          = 8
-APP_HEADER_CRC_OFFSET           = 12
-
-
-
+# Address option value requesting discovery
+ADDR_AUTO = "auto"
+
+# Header address option value requesting all images of combined file
+ADDR_ALL = "all"
+
+# Proj info max. string size
+# Unit: byte
+PROJ_INFO_STRING_SIZE = 2048
+
+# Proj info fields, as generated by proj_info.py
+PROJ_INFO_FIELDS = {
+    "Project name"  : "project",
+    "Build config"  : "build_config",
+    "PC name"       : "pc_name",
+    "Host OS"       : "host_os",
+    "Author"        : "author",
+    "Email"         : "email",
+    "Origin"        : "origin",
+    "Branch"        : "branch",
+    "Commit SHA"    : "commit_sha",
+}
 
 # Tool description
 TOOL_DESCRIPTION = \
@@ -72,23 +78,49 @@ def arg_parser():
 
     # Add arguments
     parser.add_argument("-v",   help="get version",                             action="store_true" ,                  required=False )
-    parser.add_argument("-f",   help="HEX file",                                metavar="hex_file",        type=str,   required=False )
-    parser.add_argument("-ha",  help="application header HEX file location",    metavar="app_header_addr", type=str,   required=False )
-    parser.add_argument("-ba",  help="build info HEX file location",            metavar="build_info_addr", type=str,   required=False )
+    parser.add_argument("-f",   help="HEX or BIN files",                        metavar="hex_file",        type=str,   required=False,  nargs="+",  default=[] )
+    parser.add_argument("-ha",  help="application header HEX file location, \"auto\" or \"all\"", metavar="app_header_addr", type=str,   required=False )
+    parser.add_argument("-ba",  help="build info HEX file location or \"auto\"", metavar="build_info_addr", type=str,   required=False )
+    parser.add_argument("-l",   help="legacy (Revision V1.x.x) application header", action="store_true",               required=False )
+    parser.add_argument("-b",   help="BIN file base address",                   metavar="bin_base_addr",   type=str,   required=False,  default="0" )
+    parser.add_argument("-c",   help="result cache directory",                  metavar="cache_dir",       type=str,   required=False )
+    parser.add_argument("-fmt", "--format", help="output format",               choices=( "text", "json", "ndjson" ),  required=False,  default="text",  dest="fmt" )
+    parser.add_argument("-vf",  help="verify image integrity (requires -ha)",   action="store_true",                   required=False )
+    parser.add_argument("-co",  help="verify image CRC only, skip SHA256",      action="store_true",                   required=False )
+    parser.add_argument("-k",   help="signature public key file",               metavar="key_file",        type=str,   required=False )
+    parser.add_argument("-ek",  help="image decryption key file",               metavar="enc_key_file",    type=str,   required=False )
+    parser.add_argument("-iv",  help="AES-CTR initial counter block (default: zeros)", metavar="enc_iv",   type=str,   required=False )
+    parser.add_argument("-df",  help="compare with other HEX or BIN file",      metavar="diff_file",       type=str,   required=False )
+    parser.add_argument("-fb",  help="gap fill byte",                           metavar="fill_byte",       type=str,   required=False,  default="%02X" % IMAGE_FILL_BYTE )
 
     # Get args
     args = parser.parse_args()
 
+    # Verification without header would silently pass
+    if args.vf and args.ha is None:
+        parser.error("-vf requires image header location (-ha)")
+
     # Convert namespace to dict
     args = vars(args)
 
     # Get arguments
-    file_name       = args["f"]
+    files           = args["f"]
     ver_flag        = args["v"]
     app_head_addr   = args["ha"]
-    build_info_addr = args["ha"]
-
-    return file_name, ver_flag, app_head_addr, build_info_addr
+    build_info_addr = args["ba"]
+    base_addr       = int( args["b"], 16 )
+    legacy          = args["l"]
+    cache_dir       = args["c"]
+    out_format      = args["fmt"]
+    verify          = args["vf"]
+    use_sha         = not args["co"]
+    fill            = int( args["fb"], 16 )
+    key_file        = args["k"]
+    enc_key_file    = args["ek"]
+    enc_iv          = args["iv"]
+    diff_file       = args["df"]
+
+    return files, ver_flag, app_head_addr, build_info_addr, base_addr, legacy, cache_dir, out_format, verify, use_sha, fill, key_file, enc_key_file, enc_iv, diff_file
 
 # ===============================================================================
 # @brief: Get tool version
@@ -99,76 +131,565 @@ def print_script_version():
     print("Script version: %s" % SCRIPT_VER)
 
 # ===============================================================================
-# @brief: Parse and print infor of application header
+# @brief: Parse address option
 #
-# @param[in]:    file   - HEX inputed file 
-# @param[in]:    addr   - Application header address inside HEX file
-# @return:       void
+# @param[in]:    addr   - Hex address string, "auto", "all" or None
+# @return:       Address, ADDR_AUTO, ADDR_ALL or None
 # ===============================================================================
-def parse_and_print_app_header(file, addr):
-    print("")
-    print("Parsing <%s>..." % file)
+def parse_addr(addr):
+    if addr is None or addr in ( ADDR_AUTO, ADDR_ALL ):
+        return addr
 
-    # Create and load hex file
-    ih = IntelHex()
-    ih.loadhex(file)
+    return int( addr, 16 )
 
-    # Get application header info
-    header_info = []
-    for idx in range(APP_HEADER_SIZE):
-        header_info.append( (ih[addr+idx]) )
+# ===============================================================================
+# @brief: Discover image header and project info addresses
+#
+#       Exactly one image header must be found, combined images are
+#       analyzed with ADDR_ALL. First project info block is used. Only
+#       addresses equal to ADDR_AUTO are discovered, rest are returned
+#       as they are. Caller keeps loaded image for further analysis.
+#
+# @param[in]:    image          - Loaded image (see "load_image")
+# @param[in]:    file           - HEX or BIN inputed file
+# @param[in]:    header_addr    - Image header address, ADDR_AUTO or None
+# @param[in]:    proj_info_addr - Project info address, ADDR_AUTO or None
+# @return:       Tuple of (image header address, project info address)
+# ===============================================================================
+def discover_addresses(image, file, header_addr, proj_info_addr):
+    headers, blocks = discover_image( image, little_endian=HEX_FILE_LITTLE_ENDIAN )
 
-    # Parse header informations
-    if HEX_FILE_LITTLE_ENDIAN:
+    if header_addr == ADDR_AUTO:
+        if not headers:
+            raise ImageError("%s: image header not found" % file)
 
-        # Signature
-        app_sign = ( header_info[APP_HEADER_SIGNATURE_OFFSET+0] << 0 )  | ( header_info[APP_HEADER_SIGNATURE_OFFSET+1] << 8 ) | \
-                    ( header_info[APP_HEADER_SIGNATURE_OFFSET+2] << 16 ) | ( header_info[APP_HEADER_SIGNATURE_OFFSET+3] << 24 )
+        if len(headers) > 1:
+            raise ImageError("%s: %d image headers found (%s), use \"all\" or give header address" %
+                             ( file, len(headers), ", ".join( "0x%08X" % addr for addr, _ in headers )))
 
-        # Application size
-        app_size =  ( header_info[APP_HEADER_SIZE_OFFSET+0] << 0 )  | ( header_info[APP_HEADER_SIZE_OFFSET+1] << 8 ) | \
-                    ( header_info[APP_HEADER_SIZE_OFFSET+2] << 16 ) | ( header_info[APP_HEADER_SIZE_OFFSET+3] << 24 )
+        header_addr = headers[0][0]
 
-        # Application CRC
-        app_crc =  ( header_info[APP_HEADER_CRC_OFFSET+0] << 0 )   | ( header_info[APP_HEADER_CRC_OFFSET+1] << 8 ) | \
-                    ( header_info[APP_HEADER_CRC_OFFSET+2] << 16 ) | ( header_info[APP_HEADER_CRC_OFFSET+3] << 24 )
-    else:
+    if proj_info_addr == ADDR_AUTO:
+        if not blocks:
+            raise ImageError("%s: project info not found" % file)
+        proj_info_addr = blocks[0]
 
-        # Signature
-        app_sign =  ( header_info[APP_HEADER_SIGNATURE_OFFSET+3] << 0 )  | ( header_info[APP_HEADER_SIGNATURE_OFFSET+2] << 8 ) | \
-                    ( header_info[APP_HEADER_SIGNATURE_OFFSET+1] << 16 ) | ( header_info[APP_HEADER_SIGNATURE_OFFSET+0] << 24 )
+    return header_addr, proj_info_addr
 
-        # Application size
-        app_size =  ( header_info[APP_HEADER_SIZE_OFFSET+3] << 0 )  | ( header_info[APP_HEADER_SIZE_OFFSET+2] << 8 ) | \
-                    ( header_info[APP_HEADER_SIZE_OFFSET+1] << 16 ) | ( header_info[APP_HEADER_SIZE_OFFSET+0] << 24 )
+# ===============================================================================
+# @brief: Format size for printing
+#
+# @param[in]:    size   - Size in bytes
+# @return:       Size string
+# ===============================================================================
+def format_size(size):
+    return "%d bytes (%.2f kB)" % ( size, size / 1024 )
 
-        # Application CRC
-        app_crc =  ( header_info[APP_HEADER_CRC_OFFSET+3] << 0 )   | ( header_info[APP_HEADER_CRC_OFFSET+2] << 8 ) | \
-                    ( header_info[APP_HEADER_CRC_OFFSET+1] << 16 ) | ( header_info[APP_HEADER_CRC_OFFSET+0] << 24 )
+# ===============================================================================
+# @brief: Print image header
+#
+# @param[in]:    header     - Decoded image header
+# @param[in]:    crc_valid  - Image header CRC check result
+# @return:       void
+# ===============================================================================
+def print_app_header(header, crc_valid):
+    print("-------------------------------------------------------------")
+    print("     IMAGE HEADER INFORMATIONS" )
+    print("-------------------------------------------------------------")
+    print(" -Header CRC: \t0x%02X (%s)" % ( header.crc, "OK" if crc_valid else "ERROR" ))
+    print(" -Header ver: \t%d" % header.ver )
+    print(" -Image type: \t%s" % IMAGE_TYPE_NAMES.get( header.image_type, "Unknown (%d)" % header.image_type ))
+    print(" -SW version: \t%s" % ver_to_str( header.sw_ver ))
+    print(" -HW version: \t%s" % ver_to_str( header.hw_ver ))
+    print(" -Image size: \t%s" % format_size( header.image_size ))
+    print(" -Image addr: \t0x%08X" % header.image_addr )
+    print(" -Image CRC: \t0x%08X" % header.image_crc )
+    print(" -Enc type: \t%s" % ENC_TYPE_NAMES.get( header.enc_type, "Unknown (%d)" % header.enc_type ))
+    print(" -Enc CRC: \t0x%08X" % header.enc_image_crc )
+    print(" -Sig type: \t%s" % SIG_TYPE_NAMES.get( header.sig_type, "Unknown (%d)" % header.sig_type ))
+    print(" -Signature: \t%s" % header.signature.hex() )
+    print(" -Hash: \t%s" % header.hash.hex() )
+    print(" -Git SHA: \t%s" % header.git_sha.hex() )
+    print("-------------------------------------------------------------")
 
+# ===============================================================================
+# @brief: Print legacy (Revision V1.x.x) application header
+#
+# @param[in]:    header - Decoded legacy application header
+# @return:       void
+# ===============================================================================
+def print_legacy_app_header(header):
     print("-------------------------------------------------------------")
     print("     APPLICATION HEADER INFORMATIONS" )
     print("-------------------------------------------------------------")
-    print(" -Signature: \t0x%08X" % app_sign )
-    print(" -SW version: \tV%d.%d.%d.%d" % ( header_info[APP_HEADER_SW_MAJOR_OFFSET], header_info[APP_HEADER_SW_MINOR_OFFSET], header_info[APP_HEADER_SW_DEVELOP_OFFSET], header_info[APP_HEADER_SW_TEST_OFFSET] ))
-    print(" -App size: \t%d kb" % (app_size/1024))
-    print(" -App CRC: \t0x%08X" % app_crc )
+    print(" -Signature: \t0x%08X" % header.signature )
+    print(" -SW version: \tV%d.%d.%d.%d" % ( header.sw_major, header.sw_minor, header.sw_develop, header.sw_test ))
+    print(" -App size: \t%s" % format_size( header.app_size ))
+    print(" -App CRC: \t0x%08X" % header.app_crc )
     print("-------------------------------------------------------------")
 
+# ===============================================================================
+# @brief: Read image informations from image reader
+#
+#       Image header and project informations are read in single pass.
+#
+# @param[in]:    image          - Image reader
+# @param[in]:    header_addr    - Image header address inside file
+# @param[in]:    proj_info_addr - Project info address, None if not used
+# @return:       Dictionary of image informations
+# ===============================================================================
+def read_image_info(image, header_addr, proj_info_addr=None):
+    windows = [( header_addr, HEADER_SIZE )]
+    if proj_info_addr is not None:
+        windows.append(( proj_info_addr, PROJ_INFO_STRING_SIZE ))
+
+    with timings.phase( "header_decode" ):
+        bufs    = image.read_windows( windows, 0 )
+        header  = ImageHeader.from_buffer( bufs[0], 0, HEX_FILE_LITTLE_ENDIAN )
 
+    info = header.to_dict()
+    info["header_crc_valid"] = check_header_crc( bufs[0] )
+
+    if proj_info_addr is not None:
+        info["proj_info"]   = decode_proj_info( bytes( bufs[1] ))
+        info["build_info"]  = parse_proj_info( info["proj_info"] )
+
+    return info
+
+# ===============================================================================
+# @brief: Analyze image
+#
+#       Only image header and project info windows of file are read.
+#
+# @param[in]:    file           - HEX or BIN inputed file
+# @param[in]:    header_addr    - Image header address inside file
+# @param[in]:    proj_info_addr - Project info address, None if not used
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @return:       Dictionary of image informations
+# ===============================================================================
+def analyze_image(file, header_addr, proj_info_addr=None, base_addr=0):
+    info = { "file": file }
+
+    with open_image( file, base_addr ) as image:
+        info.update( read_image_info( image, header_addr, proj_info_addr ))
+
+    return info
+
+# ===============================================================================
+# @brief: Get analysis settings identifier for result cache
+#
+# @param[in]:    header_addr    - Image header address inside file
+# @param[in]:    proj_info_addr - Project info address, None if not used
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @return:       Analysis settings string
+# ===============================================================================
+def get_analysis_params(header_addr, proj_info_addr, base_addr):
+    import json
+    return json.dumps([ SCRIPT_VER, HEX_FILE_LITTLE_ENDIAN, header_addr, proj_info_addr, base_addr ])
+
+# ===============================================================================
+# @brief: Analyze image with result cache
+#
+# @param[in]:    cache_dir      - Result cache directory
+# @param[in]:    file           - HEX or BIN inputed file
+# @param[in]:    header_addr    - Image header address inside file
+# @param[in]:    proj_info_addr - Project info address, None if not used
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @return:       Dictionary of image informations
+# ===============================================================================
+def analyze_image_cached(cache_dir, file, header_addr, proj_info_addr=None, base_addr=0):
+    from result_cache import ResultCache, calc_file_state
+
+    params = get_analysis_params( header_addr, proj_info_addr, base_addr )
+
+    with ResultCache( cache_dir ) as cache:
+        info = cache.get( file, params )
+        if info is None:
+
+            # File state is taken before analysis
+            state = calc_file_state( file )
+            info  = analyze_image( file, header_addr, proj_info_addr, base_addr )
+            cache.put( file, params, info, state )
+
+    return info
+
+# ===============================================================================
+# @brief: Decode project info string
+#
+#       String is terminated with first NULL character or at the end of
+#       project info section.
+#
+# @param[in]:    buf    - Project info section data
+# @return:       Project info string
 # ===============================================================================
-# @brief: Parse and print build information
+def decode_proj_info(buf):
+    end = buf.find( b"\0" )
+    if end < 0:
+        end = len(buf)
+
+    return buf[:end].decode( "utf-8", "replace" )
+
+# ===============================================================================
+# @brief: Parse project info string into fields
+#
+# @param[in]:    proj_info  - Project info string
+# @return:       Dictionary of known project info fields
+# ===============================================================================
+def parse_proj_info(proj_info):
+    fields = {}
+
+    for line in proj_info.splitlines():
+        key, sep, value = line.partition( ": " )
+        key = key.strip()
+
+        if sep and key in PROJ_INFO_FIELDS:
+            fields[PROJ_INFO_FIELDS[key]] = value.strip()
+
+    return fields
+
+# ===============================================================================
+# @brief: Decode build information
 #
 #       Read till NULL termination!
 #
-# @param[in]:    file   - HEX inputed file 
-# @param[in]:    addr   - Build info address inside HEX file
+# @param[in]:    file       - HEX or BIN inputed file 
+# @param[in]:    addr       - Build info address inside HEX file
+# @param[in]:    base_addr  - Address of first byte in BIN file
+# @return:       Tuple of (project info string, dictionary of project info fields)
+# ===============================================================================
+def decode_build_info(file, addr, base_addr=0):
+
+    # Read only project info window
+    with open_image( file, base_addr ) as image:
+        return read_build_info( image, addr )
+
+# ===============================================================================
+# @brief: Read build information from image reader
+#
+# @param[in]:    image      - Image reader
+# @param[in]:    addr       - Build info address
+# @return:       Tuple of (project info string, dictionary of project info fields)
+# ===============================================================================
+def read_build_info(image, addr):
+    with timings.phase( "build_info_decode" ):
+        proj_info = decode_proj_info( bytes( image.read( addr, PROJ_INFO_STRING_SIZE, 0 )))
+
+    return proj_info, parse_proj_info( proj_info )
+
+# ===============================================================================
+# @brief: Analyze single image of combined file
+#
+# @param[in]:    image          - Image reader
+# @param[in]:    header_addr    - Image header address
+# @param[in]:    header         - Decoded image header
+# @param[in]:    verify         - Verify image integrity
+# @param[in]:    verify_args    - Dictionary of additional "verify_image" arguments
+# @return:       Dictionary of image informations
+# ===============================================================================
+def analyze_sub_image(image, header_addr, header, verify=False, verify_args=None):
+    info = {
+        "header_addr"   : header_addr,
+        "image_start"   : get_image_start( header, header_addr ),
+        "header"        : header.to_dict(),
+        "valid"         : True,
+    }
+
+    # Only headers with valid CRC are discovered
+    info["header"]["header_crc_valid"] = True
+
+    if verify:
+        info["verify"]  = verify_image( image, header_addr, little_endian=HEX_FILE_LITTLE_ENDIAN, **verify_args )
+        info["valid"]   = info["verify"]["valid"]
+
+    return info
+
+# ===============================================================================
+# @brief: Analyze all images of combined file
+#
+#       File is loaded once and all image headers (bootloader, application,
+#       custom images) are discovered in it. Images are verified
+#       concurrently from the same loaded image, CRC and hash calculation
+#       release GIL so threads run in parallel.
+#
+# @param[in]:    file           - HEX or BIN inputed file
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @param[in]:    verify         - Verify image integrity
+# @param[in]:    verify_args    - Dictionary of additional "verify_image" arguments
+# @return:       Tuple of (list of image informations sorted by header address, list of project info addresses)
+# ===============================================================================
+def analyze_images(file, base_addr=0, verify=False, verify_args=None):
+    import concurrent.futures
+
+    with load_image( file, base_addr ) as image:
+        headers, blocks = discover_image( image, little_endian=HEX_FILE_LITTLE_ENDIAN )
+
+        if not headers:
+            raise ImageError("%s: image header not found" % file)
+
+        with concurrent.futures.ThreadPoolExecutor( max_workers=min( len(headers), os.cpu_count() or 1 )) as executor:
+            futures = [ executor.submit( analyze_sub_image, image, header_addr, header, verify, verify_args ) for header_addr, header in headers ]
+            images  = [ future.result() for future in futures ]
+
+    return images, blocks
+
+# ===============================================================================
+# @brief: Load verification keys
+#
+#       Decryption settings are checked here as well, so they fail once
+#       instead of for every file.
+#
+# @param[in]:    key_file       - Signature public key file, None if not used
+# @param[in]:    enc_key_file   - Decryption key file, None if not used
+# @param[in]:    enc_iv         - AES-CTR initial counter block, None for default
+# @return:       Tuple of (public key, decryption key), None if not used
+# ===============================================================================
+def load_verify_keys(key_file=None, enc_key_file=None, enc_iv=None):
+    public_key = None
+    if key_file is not None:
+        from image_signature import load_public_key
+        public_key = load_public_key( key_file )
+
+    enc_key = None
+    if enc_key_file is not None:
+        from image_encryption import load_aes_key, parse_aes_iv, import_cryptography
+        enc_key = load_aes_key( enc_key_file )
+        parse_aes_iv( enc_iv )
+        import_cryptography()
+
+    return public_key, enc_key
+
+# ===============================================================================
+# @brief: Analyze single file
+#
+#       Decoding only, result is rendered separately.
+#
+# @param[in]:    file           - HEX or BIN inputed file
+# @param[in]:    header_addr    - Image header address, ADDR_AUTO, ADDR_ALL or None if not used
+# @param[in]:    build_info_addr - Build info address, ADDR_AUTO or None if not used
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @param[in]:    legacy         - Legacy (Revision V1.x.x) application header
+# @param[in]:    cache_dir      - Result cache directory, None if not used
+# @param[in]:    verify         - Verify image integrity instead of decoding header
+# @param[in]:    verify_args    - Dictionary of additional "verify_image" arguments
+# @param[in]:    diff_file      - File to compare with, None if not used
+# @return:       Dictionary of analysis results
+# ===============================================================================
+def analyze_file(file, header_addr=None, build_info_addr=None, base_addr=0, legacy=False, cache_dir=None, verify=False, verify_args=None, diff_file=None):
+    result = { "file": file, "valid": True }
+
+    # Image loaded for discovery, reused by following steps
+    image = None
+
+    try:
+        if legacy and header_addr in ( ADDR_AUTO, ADDR_ALL ):
+            raise ImageError("legacy application header can not be discovered")
+
+        if header_addr == ADDR_ALL:
+            result["images"], blocks = analyze_images( file, base_addr, verify, verify_args )
+            result["valid"] = all( info["valid"] for info in result["images"] )
+
+            # Headers are not compared, they may differ in number
+            header_addr = None
+
+            # Project info found in same pass
+            if build_info_addr == ADDR_AUTO and blocks:
+                build_info_addr             = blocks[0]
+                result["build_info_addr"]   = build_info_addr
+
+        if ADDR_AUTO in ( header_addr, build_info_addr ):
+            image = load_image( file, base_addr )
+            header_addr, build_info_addr = discover_addresses( image, file, header_addr, build_info_addr )
+            result["header_addr"]       = header_addr
+            result["build_info_addr"]   = build_info_addr
+
+        if diff_file is not None:
+            if image is None:
+                image = load_image( file, base_addr )
+
+            with load_image( diff_file, base_addr ) as image_b:
+                result["diff_file"] = diff_file
+                result["diff"]      = diff_images( image, image_b, header_addr, HEX_FILE_LITTLE_ENDIAN )
+                result["valid"]     = result["diff"]["identical"]
+            return result
+
+        if header_addr is not None:
+            if verify:
+                if image is None:
+                    image = load_image( file, base_addr )
+
+                result["verify"] = verify_image( image, header_addr, little_endian=HEX_FILE_LITTLE_ENDIAN, **verify_args )
+                result["valid"] = result["verify"]["valid"]
+
+            elif legacy:
+
+                # Read only application header window, unless image is already loaded
+                if image is not None:
+                    header_buf = image.read( header_addr, LEGACY_HEADER_SIZE )
+                else:
+                    with open_image( file, base_addr ) as window:
+                        header_buf = window.read( header_addr, LEGACY_HEADER_SIZE )
+
+                result["legacy_header"] = LegacyImageHeader.from_buffer( header_buf, 0, HEX_FILE_LITTLE_ENDIAN ).to_dict()
+
+            else:
+
+                # Header and build info read in single pass
+                if cache_dir is not None:
+                    info = analyze_image_cached( cache_dir, file, header_addr, build_info_addr, base_addr )
+                    del info["file"]
+                elif image is not None:
+                    info = read_image_info( image, header_addr, build_info_addr )
+                else:
+                    info = analyze_image( file, header_addr, build_info_addr, base_addr )
+                    del info["file"]
+
+                if "proj_info" in info:
+                    result["proj_info"]     = info.pop( "proj_info" )
+                    result["build_info"]    = info.pop( "build_info" )
+
+                result["header"] = info
+
+        if build_info_addr is not None and "proj_info" not in result:
+            if image is not None:
+                result["proj_info"], result["build_info"] = read_build_info( image, build_info_addr )
+            else:
+                result["proj_info"], result["build_info"] = decode_build_info( file, build_info_addr, base_addr )
+
+    except ( ImageError, ImageHeaderError, ImageSignatureError, ImageEncryptionError, OSError ) as e:
+        result["error"] = str(e)
+        result["valid"] = False
+
+    finally:
+        if image is not None:
+            image.close()
+
+    return result
+
+# ===============================================================================
+# @brief: Print verification result
+#
+# @param[in]:    result - Verification result
+# @return:       void
+# ===============================================================================
+def print_verify_result(result):
+    status = { True: "OK", False: "ERROR", None: "skipped" }
+    print(" -Header CRC: \t%s" % status[result["header_crc_valid"]] )
+    print(" -Image CRC: \t%s" % status[result["image_crc_valid"]] )
+    print(" -Image hash: \t%s" % status[result["hash_valid"]] )
+    print(" -Enc CRC: \t%s" % status[result["enc_crc_valid"]] )
+    print(" -Signature: \t%s" % status[result["signature_valid"]] )
+    print(" -Image: \t%s" % ( "VALID" if result["valid"] else "INVALID" ))
+
+# ===============================================================================
+# @brief: Print image comparison result
+#
+# @param[in]:    result - Comparison result
 # @return:       void
 # ===============================================================================
-def parse_and_print_build_info(file, addr):
-    pass
+def print_diff_result(result):
+    if result["header"] is not None:
+        print(" -Header: \t%s" % ( "changed" if result["header"] else "identical" ))
+        for name, ( value_a, value_b ) in result["header"].items():
+            if isinstance( value_a, int ):
+                print("   %s: \t0x%08X -> 0x%08X" % ( name, value_a, value_b ))
+            else:
+                print("   %s: \t%s -> %s" % ( name, value_a, value_b ))
+
+    for key, title in (( "changed", "Changed" ), ( "only_a", "Only in first" ), ( "only_b", "Only in second" )):
+        print(" -%s: \t%d bytes in %d ranges" % ( title, sum( end - start for start, end in result[key] ), len( result[key] )))
+        for start, end in result[key]:
+            print("   0x%08X..0x%08X (%d bytes)" % ( start, end - 1, end - start ))
+
+    print(" -Images: \t%s" % ( "IDENTICAL" if result["identical"] else "DIFFERENT" ))
 
+# ===============================================================================
+# @brief: Print analysis result as text
+#
+# @param[in]:    result - Analysis result of single file
+# @return:       void
+# ===============================================================================
+def print_result(result):
+    file = result["file"]
+
+    if result.get( "header_addr" ) is not None:
+        print("")
+        print("Found image header of <%s> at 0x%08X" % ( file, result["header_addr"] ))
+
+    if result.get( "build_info_addr" ) is not None:
+        print("")
+        print("Found build info of <%s> at 0x%08X" % ( file, result["build_info_addr"] ))
+
+    for info in result.get( "images", [] ):
+        print("")
+        print("Parsing <%s> image at 0x%08X..." % ( file, info["header_addr"] ))
+        print(" -Image start: \t0x%08X" % info["image_start"] )
+        print_app_header( ImageHeader.from_dict( info["header"] ), info["header"]["header_crc_valid"] )
+
+        if "verify" in info:
+            print_verify_result( info["verify"] )
+
+    if "diff" in result:
+        print("")
+        print("Comparing <%s> with <%s>..." % ( file, result["diff_file"] ))
+        print_diff_result( result["diff"] )
+
+    if "verify" in result:
+        print("")
+        print("Verifying <%s>..." % file)
+        print_verify_result( result["verify"] )
+
+    if "header" in result:
+        print("")
+        print("Parsing <%s>..." % file)
+        print_app_header( ImageHeader.from_dict( result["header"] ), result["header"]["header_crc_valid"] )
+
+    if "legacy_header" in result:
+        print("")
+        print("Parsing <%s>..." % file)
+        print_legacy_app_header( LegacyImageHeader( result["legacy_header"].items() ))
+
+    if "proj_info" in result:
+        print("")
+        print("Parsing <%s>..." % file)
+        print( result["proj_info"] )
+
+    if "error" in result:
+        print("")
+        print("ERROR: %s" % result["error"])
 
+# ===============================================================================
+# @brief: Write analysis results
+#
+#       NDJSON lines are written and flushed as soon as each file is
+#       analyzed, JSON is written as single array at the end.
+#
+# @param[in]:    results    - Iterable of analysis results
+# @param[in]:    out_format - Output format, "text", "json" or "ndjson"
+# @param[in]:    out        - Output stream
+# @return:       True if all results are valid
+# ===============================================================================
+def write_results(results, out_format="text", out=sys.stdout):
+    if out_format != "text":
+        import json
+
+    valid       = True
+    collected   = []
+
+    for result in results:
+        valid = valid and result["valid"]
+
+        if out_format == "ndjson":
+            out.write( json.dumps( result ) + "\n" )
+            out.flush()
+        elif out_format == "json":
+            collected.append( result )
+        else:
+            print_result( result )
+
+    if out_format == "json":
+        out.write( json.dumps( collected, indent=4 ) + "\n" )
+
+    return valid
 
 # ===============================================================================
 # @brief:   Main entry
@@ -178,7 +699,7 @@ def parse_and_print_build_info(file, addr):
 def main():
 
     # Get invocation arguments
-    file_name, ver_flag, app_head_addr, build_info_addr = arg_parser()
+    files, ver_flag, app_head_addr, build_info_addr, base_addr, legacy, cache_dir, out_format, verify, use_sha, fill, key_file, enc_key_file, enc_iv, diff_file = arg_parser()
 
     # Version infor
     if ver_flag:
@@ -186,27 +707,26 @@ def main():
 
     # Hex file info
     else:
-        
-        # Get application header information request
-        if app_head_addr is not None:
-
-            # Convert to hex
-            app_head_addr = int( app_head_addr, 16 )
-
-            # Get hex info actions
-            parse_and_print_app_header( file_name, app_head_addr )
 
+        # Convert to hex, discovered addresses are resolved per file
+        app_head_addr   = parse_addr( app_head_addr )
+        build_info_addr = parse_addr( build_info_addr )
 
-        # Get build information request
-        if build_info_addr is not None:
+        # Keys are loaded once for all files
+        verify_args = None
+        if verify:
+            try:
+                public_key, enc_key = load_verify_keys( key_file, enc_key_file, enc_iv )
+            except ( ImageSignatureError, ImageEncryptionError, OSError ) as e:
+                sys.exit( "ERROR: %s" % e )
+            verify_args = dict( fill=fill, use_sha=use_sha, public_key=public_key, enc_key=enc_key, enc_iv=enc_iv )
 
-            # Convert to hex
-            build_info_addr = int( build_info_addr, 16 )
+        # Files are analyzed one by one as results are written
+        results = ( analyze_file( file, app_head_addr, build_info_addr, base_addr, legacy, cache_dir, verify, verify_args, diff_file ) for file in files )
 
-            # Get hex info actions
-            parse_and_print_build_info( file_name, build_info_addr )
+        if not write_results( results, out_format ):
+            sys.exit( 1 )
 
-        
     
 # ===============================================================================
 #       CLASSES
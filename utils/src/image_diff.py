@@ -0,0 +1,175 @@
+# ===============================================================================
+# @file:    image_diff.py
+# @note:    Comparison of two firmware images
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Compares image header fields and payload of two images. Data
+#           segments of both images are walked in parallel, common ranges
+#           are compared in large blocks and only differing blocks are
+#           compared byte by byte.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import timings
+
+from image_header import ImageHeader, HEADER_SIZE
+
+# ===============================================================================
+#       DIFF SETTINGS
+# ===============================================================================
+
+# Size of block compared at once
+# Unit: byte
+DIFF_BLOCK_SIZE = 4096
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Intersect two lists of address ranges
+#
+# @param[in]:    ranges_a   - Sorted list of (start, end) tuples
+# @param[in]:    ranges_b   - Sorted list of (start, end) tuples
+# @return:       Sorted list of ranges covered by both lists
+# ===============================================================================
+def intersect_ranges(ranges_a, ranges_b):
+    result  = []
+    idx_a   = 0
+    idx_b   = 0
+
+    while idx_a < len(ranges_a) and idx_b < len(ranges_b):
+        start   = max( ranges_a[idx_a][0], ranges_b[idx_b][0] )
+        end     = min( ranges_a[idx_a][1], ranges_b[idx_b][1] )
+
+        if start < end:
+            result.append(( start, end ))
+
+        # Advance range that ends first
+        if ranges_a[idx_a][1] < ranges_b[idx_b][1]:
+            idx_a += 1
+        else:
+            idx_b += 1
+
+    return result
+
+# ===============================================================================
+# @brief: Subtract address ranges
+#
+# @param[in]:    ranges_a   - Sorted list of (start, end) tuples
+# @param[in]:    ranges_b   - Sorted list of (start, end) tuples
+# @return:       Sorted list of ranges covered by "ranges_a" but not "ranges_b"
+# ===============================================================================
+def subtract_ranges(ranges_a, ranges_b):
+    result  = []
+    idx_b   = 0
+
+    for start, end in ranges_a:
+
+        # Skip ranges ending before current range
+        while idx_b < len(ranges_b) and ranges_b[idx_b][1] <= start:
+            idx_b += 1
+
+        idx = idx_b
+        while idx < len(ranges_b) and ranges_b[idx][0] < end:
+            if ranges_b[idx][0] > start:
+                result.append(( start, ranges_b[idx][0] ))
+            start = max( start, ranges_b[idx][1] )
+            idx += 1
+
+        if start < end:
+            result.append(( start, end ))
+
+    return result
+
+# ===============================================================================
+# @brief: Find differing address ranges of two equally sized buffers
+#
+#       Buffers are compared in blocks, byte by byte comparison is done
+#       only inside differing blocks. Adjacent differences are merged.
+#
+# @param[in]:    buf_a      - First buffer
+# @param[in]:    buf_b      - Second buffer
+# @param[in]:    addr       - Address of first byte
+# @param[in]:    block_size - Size of compared block
+# @return:       List of (start, end) tuples of differing ranges
+# ===============================================================================
+def diff_buffers(buf_a, buf_b, addr, block_size=DIFF_BLOCK_SIZE):
+    view_a  = memoryview( buf_a )
+    view_b  = memoryview( buf_b )
+    result  = []
+
+    for block in range( 0, len(view_a), block_size ):
+        block_a = view_a[block:block+block_size]
+        block_b = view_b[block:block+block_size]
+
+        if block_a == block_b:
+            continue
+
+        for idx, ( byte_a, byte_b ) in enumerate( zip( block_a, block_b )):
+            if byte_a == byte_b:
+                continue
+
+            byte_addr = addr + block + idx
+            if result and result[-1][1] == byte_addr:
+                result[-1] = ( result[-1][0], byte_addr + 1 )
+            else:
+                result.append(( byte_addr, byte_addr + 1 ))
+
+    return result
+
+# ===============================================================================
+# @brief: Compare image headers
+#
+# @param[in]:    header_a   - First image header
+# @param[in]:    header_b   - Second image header
+# @return:       Dictionary of changed fields, values are (first, second) tuples
+# ===============================================================================
+def diff_headers(header_a, header_b):
+    fields_a = header_a.to_dict()
+    fields_b = header_b.to_dict()
+
+    return { name: ( value, fields_b[name] ) for name, value in fields_a.items() if value != fields_b[name] }
+
+# ===============================================================================
+# @brief: Compare two images
+#
+# @param[in]:    image_a        - First image reader
+# @param[in]:    image_b        - Second image reader
+# @param[in]:    header_addr    - Image header address, None to skip header comparison
+# @param[in]:    little_endian  - Byte order of multi-byte fields
+# @return:       Dictionary of differences
+# ===============================================================================
+def diff_images(image_a, image_b, header_addr=None, little_endian=True):
+    segments_a  = image_a.segments()
+    segments_b  = image_b.segments()
+    common      = intersect_ranges( segments_a, segments_b )
+
+    # Common ranges of each image are read in single pass
+    windows = [( start, end - start ) for start, end in common ]
+    ranges  = []
+    with timings.phase( "diff" ):
+        for ( start, _ ), buf_a, buf_b in zip( common, image_a.read_windows( windows ), image_b.read_windows( windows )):
+            ranges.extend( diff_buffers( buf_a, buf_b, start ))
+
+    result = {
+        "header"    : None,
+        "changed"   : ranges,
+        "only_a"    : subtract_ranges( segments_a, segments_b ),
+        "only_b"    : subtract_ranges( segments_b, segments_a ),
+    }
+
+    if header_addr is not None:
+        result["header"] = diff_headers( ImageHeader.from_buffer( image_a.read( header_addr, HEADER_SIZE ), 0, little_endian ),
+                                         ImageHeader.from_buffer( image_b.read( header_addr, HEADER_SIZE ), 0, little_endian ))
+
+    result["identical"] = not ( result["header"] or ranges or result["only_a"] or result["only_b"] )
+
+    return result
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,216 @@
+# ===============================================================================
+# @file:    image_discovery.py
+# @note:    Discovery of image header and project info inside image
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Locates "ver_image_header_t" and project info block without
+#           knowing their addresses. Candidates are found by regular
+#           expression scan over image segments (done in C) and only
+#           those are fully validated in Python.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import re
+import struct
+
+import timings
+
+from image_header import ImageHeader, ImageHeaderError, HEADER_LAYOUTS, HEADER_RESERVED_FIELDS, HEADER_SIZE, HEADER_VER_OFFSET, \
+                         IMAGE_TYPE_NUM_OF, ENC_TYPE_NUM_OF, SIG_TYPE_NUM_OF, check_header_crc, get_image_start
+
+# ===============================================================================
+#       DISCOVERY SETTINGS
+# ===============================================================================
+
+# Image header alignment inside image
+# Unit: byte
+HEADER_ALIGNMENT = 4
+
+# Number of values of single byte enumeration fields
+HEADER_ENUM_FIELDS = { "image_type": IMAGE_TYPE_NUM_OF, "enc_type": ENC_TYPE_NUM_OF, "sig_type": SIG_TYPE_NUM_OF }
+
+# Project info block marker, as generated by proj_info.py
+PROJ_INFO_MARKER = b"PROJECT INFORMATIONS"
+
+# Characters allowed between start of project info block and marker
+PROJ_INFO_PREFIX_CHARS = b"=\r\n\t "
+
+# Max. distance between start of project info block and marker
+# Unit: byte
+PROJ_INFO_PREFIX_SIZE = 64
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Build regular expression character class
+#
+# @param[in]:    values - Byte values
+# @return:       Character class pattern
+# ===============================================================================
+def byte_class(values):
+    return b"[" + b"".join( b"\\x%02x" % value for value in values ) + b"]"
+
+# ===============================================================================
+# @brief: Build header candidate pattern of single layout
+#
+#       Pattern starts at "ctrl.ver". Enumeration fields must hold valid
+#       value and reserved fields must be zero (as set by "version.c"
+#       initializer), all other fields match any value.
+#
+# @param[in]:    ver    - Header version
+# @param[in]:    fmt    - Struct format without byte order character
+# @param[in]:    names  - Field names
+# @return:       Pattern
+# ===============================================================================
+def layout_pattern(ver, fmt, names):
+    items   = re.findall( r"(\d*)([a-zA-Z])", fmt )
+    pattern = b""
+
+    for name, ( count, code ) in zip( names, items ):
+        size = struct.calcsize( "<" + count + code )
+
+        if name == "crc":
+            continue
+        elif name == "ver":
+            pattern += b"\\x%02x(?=" % ver
+        elif name in HEADER_ENUM_FIELDS:
+            pattern += byte_class( range( HEADER_ENUM_FIELDS[name] ))
+        elif name in HEADER_RESERVED_FIELDS:
+            pattern += b"\\x00{%d}" % size
+        else:
+            pattern += b".{%d}" % size
+
+    return pattern + b")"
+
+# ------------------------------------------------------------------------
+#   Header candidate: known "ctrl.ver" with valid enumerations and zero
+#   reserved fields
+#
+#   Only "ctrl.ver" byte is consumed, so overlapping candidates (e.g.
+#   header CRC equal to version) are not skipped.
+# ------------------------------------------------------------------------
+HEADER_CANDIDATE_PATTERN = re.compile( b"|".join( layout_pattern( ver, fmt, names ) for ver, ( fmt, names ) in HEADER_LAYOUTS.items() ), re.DOTALL )
+
+# Project info marker pattern
+PROJ_INFO_MARKER_PATTERN = re.compile( re.escape( PROJ_INFO_MARKER ))
+
+# ===============================================================================
+# @brief: Validate image header candidate
+#
+#       Fields are checked before CRC as they are cheaper. Image described
+#       by header must be non-empty and lie inside image extent.
+#
+# @param[in]:    buf            - Buffer containing candidate
+# @param[in]:    offset         - Offset of candidate inside buffer
+# @param[in]:    addr           - Address of candidate
+# @param[in]:    extent         - Tuple of (first address, last address + 1) of image
+# @param[in]:    little_endian  - Byte order of multi-byte fields
+# @return:       Image header object, None if candidate is not valid header
+# ===============================================================================
+def validate_header(buf, offset, addr, extent, little_endian=True):
+    try:
+        header = ImageHeader.from_buffer( buf, offset, little_endian )
+    except ImageHeaderError:
+        return None
+
+    if header.image_type >= IMAGE_TYPE_NUM_OF or header.enc_type >= ENC_TYPE_NUM_OF or header.sig_type >= SIG_TYPE_NUM_OF:
+        return None
+
+    if any( value.count( 0 ) != len(value) for value in ( header.ctrl_res, header.data_res )):
+        return None
+
+    image_start = get_image_start( header, addr )
+    if header.image_size == 0 or image_start < extent[0] or image_start + header.image_size > extent[1]:
+        return None
+
+    if not check_header_crc( buf, offset ):
+        return None
+
+    return header
+
+# ===============================================================================
+# @brief: Find image headers inside contiguous buffer
+#
+# @param[in]:    buf            - Segment data
+# @param[in]:    addr           - Address of first byte
+# @param[in]:    extent         - Image extent, None for buffer itself
+# @param[in]:    alignment      - Image header alignment
+# @param[in]:    little_endian  - Byte order of multi-byte fields
+# @return:       List of (address, image header) tuples, sorted by address
+# ===============================================================================
+def find_headers_in_buffer(buf, addr, extent=None, alignment=HEADER_ALIGNMENT, little_endian=True):
+    headers = []
+
+    if extent is None:
+        extent = ( addr, addr + len(buf) )
+
+    for match in HEADER_CANDIDATE_PATTERN.finditer( buf ):
+        offset = match.start() - HEADER_VER_OFFSET
+
+        if offset < 0 or offset + HEADER_SIZE > len(buf) or ( addr + offset ) % alignment:
+            continue
+
+        header = validate_header( buf, offset, addr + offset, extent, little_endian )
+        if header is not None:
+            headers.append(( addr + offset, header ))
+
+    return headers
+
+# ===============================================================================
+# @brief: Find project info blocks inside contiguous buffer
+#
+#       Block starts before marker, with separator line.
+#
+# @param[in]:    buf    - Segment data
+# @param[in]:    addr   - Address of first byte
+# @return:       List of project info block addresses, sorted by address
+# ===============================================================================
+def find_proj_info_in_buffer(buf, addr):
+    blocks = []
+
+    for match in PROJ_INFO_MARKER_PATTERN.finditer( buf ):
+        offset  = match.start()
+        limit   = max( offset - PROJ_INFO_PREFIX_SIZE, 0 )
+
+        while offset > limit and buf[offset-1] in PROJ_INFO_PREFIX_CHARS:
+            offset -= 1
+
+        blocks.append( addr + offset )
+
+    return blocks
+
+# ===============================================================================
+# @brief: Discover image headers and project info blocks
+#
+#       Each segment is read only once for both searches. Headers and
+#       blocks never cross segment boundary, as segments are maximal
+#       contiguous address ranges.
+#
+# @param[in]:    image          - Image reader
+# @param[in]:    alignment      - Image header alignment
+# @param[in]:    little_endian  - Byte order of multi-byte fields
+# @return:       Tuple of (list of (address, image header) tuples, list of project info addresses)
+# ===============================================================================
+def discover_image(image, alignment=HEADER_ALIGNMENT, little_endian=True):
+    headers = []
+    blocks  = []
+
+    with timings.phase( "discovery" ):
+        segments = image.segments()
+        extent   = ( segments[0][0], segments[-1][1] ) if segments else None
+
+        for start, end in segments:
+            buf = image.read( start, end - start )
+            headers.extend( find_headers_in_buffer( buf, start, extent, alignment, little_endian ))
+            blocks.extend( find_proj_info_in_buffer( buf, start ))
+
+    return headers, blocks
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
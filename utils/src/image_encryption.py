@@ -0,0 +1,129 @@
+# ===============================================================================
+# @file:    image_encryption.py
+# @note:    Image decryption
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Streaming AES-CTR decryption of encrypted images. Chunks are
+#           decrypted into single reused buffer, so memory usage does not
+#           depend on image size.
+#
+#           Requires "cryptography" package, imported only when decryption
+#           is used.
+# ===============================================================================
+
+# ===============================================================================
+#       ENCRYPTION SETTINGS
+# ===============================================================================
+
+# Supported AES key sizes
+# Unit: byte
+AES_KEY_SIZES = ( 16, 24, 32 )
+
+# Size of AES block and of CTR initial counter block
+# Unit: byte
+AES_BLOCK_SIZE = 16
+
+# Default initial counter block
+AES_CTR_DEFAULT_IV = bytes( AES_BLOCK_SIZE )
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Import cryptography package
+#
+# @return:       Tuple of used cryptography modules
+# ===============================================================================
+def import_cryptography():
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError:
+        raise ImageEncryptionError("image decryption requires \"cryptography\" package (pip install cryptography)")
+
+    return Cipher, algorithms, modes
+
+# ===============================================================================
+# @brief: Load AES key
+#
+#       Key file holds either raw key bytes or key as hex string.
+#
+# @param[in]:    file   - Key file
+# @return:       Key bytes
+# ===============================================================================
+def load_aes_key(file):
+    with open( file, "rb" ) as f:
+        data = f.read()
+
+    # Key as hex string
+    try:
+        key = bytes.fromhex( data.decode( "ascii" ).strip() )
+    except ( UnicodeDecodeError, ValueError ):
+        key = data
+
+    if len(key) not in AES_KEY_SIZES:
+        raise ImageEncryptionError("%s: invalid AES key size %d bytes" % ( file, len(key) ))
+
+    return key
+
+# ===============================================================================
+# @brief: Parse AES-CTR initial counter block
+#
+# @param[in]:    iv     - Initial counter block as hex string, None for default
+# @return:       Initial counter block bytes
+# ===============================================================================
+def parse_aes_iv(iv):
+    if iv is None:
+        return AES_CTR_DEFAULT_IV
+
+    try:
+        iv = bytes.fromhex( iv )
+    except ValueError:
+        raise ImageEncryptionError("invalid IV: %r" % iv)
+
+    if len(iv) != AES_BLOCK_SIZE:
+        raise ImageEncryptionError("invalid IV size %d bytes, expected %d" % ( len(iv), AES_BLOCK_SIZE ))
+
+    return iv
+
+# ===============================================================================
+# @brief: Decrypt image chunks with AES-CTR
+#
+#       Yielded chunk is view into buffer reused by next chunk, therefore it
+#       must be consumed before iteration continues.
+#
+# @param[in]:    chunks - Iterable of encrypted image chunks
+# @param[in]:    key    - AES key
+# @param[in]:    iv     - Initial counter block
+# @return:       Generator of decrypted chunks
+# ===============================================================================
+def iter_decrypted(chunks, key, iv=AES_CTR_DEFAULT_IV):
+    Cipher, algorithms, modes = import_cryptography()
+
+    decryptor   = Cipher( algorithms.AES( key ), modes.CTR( iv )).decryptor()
+    buf         = bytearray()
+
+    for chunk in chunks:
+        if len(buf) < len(chunk) + AES_BLOCK_SIZE - 1:
+            buf = bytearray( len(chunk) + AES_BLOCK_SIZE - 1 )
+
+        size = decryptor.update_into( chunk, buf )
+        yield memoryview( buf )[:size]
+
+    decryptor.finalize()
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Image encryption error
+# ===============================================================================
+class ImageEncryptionError(Exception):
+    pass
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,241 @@
+# ===============================================================================
+# @file:    image_header.py
+# @note:    Image header definition and decoding
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Python mirror of "ver_image_header_t" from version.h. Complete
+#           header is decoded with single precompiled struct unpack.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import struct
+
+from crc8 import get_crc8
+
+# ===============================================================================
+#       IMAGE HEADER SETTINGS
+# ===============================================================================
+
+# Image header size
+# Unit: byte
+HEADER_SIZE = 256
+
+# Header control fields offsets
+HEADER_CRC_OFFSET   = 0
+HEADER_VER_OFFSET   = 1
+
+# Image type (ver_image_type_t)
+IMAGE_TYPE_APP      = 0
+IMAGE_TYPE_CUSTOM   = 1
+IMAGE_TYPE_NUM_OF   = 2
+
+# Encryption type (ver_enc_type_t)
+ENC_TYPE_NONE       = 0
+ENC_TYPE_AES_CTR    = 1
+ENC_TYPE_NUM_OF     = 2
+
+# Signature type (ver_sig_type_t)
+SIG_TYPE_NONE       = 0
+SIG_TYPE_ECSDA      = 1
+SIG_TYPE_NUM_OF     = 2
+
+# Enumeration names
+IMAGE_TYPE_NAMES    = { IMAGE_TYPE_APP: "Application", IMAGE_TYPE_CUSTOM: "Custom" }
+ENC_TYPE_NAMES      = { ENC_TYPE_NONE: "None", ENC_TYPE_AES_CTR: "AES-CTR" }
+SIG_TYPE_NAMES      = { SIG_TYPE_NONE: "None", SIG_TYPE_ECSDA: "ECSDA" }
+
+# ------------------------------------------------------------------------
+#   Header layouts, selected by "ctrl.ver" field
+#
+#   Format is without byte order character, list of field names must
+#   match format items.
+# ------------------------------------------------------------------------
+HEADER_LAYOUTS = {
+
+    # Revision module V2.x.x
+    1: ( "BBB5s" "IIIIIBB64s32s8sI118s",
+         ( "crc", "ver", "image_type", "ctrl_res",
+           "sw_ver", "hw_ver", "image_size", "image_addr", "image_crc", "enc_type", "sig_type",
+           "signature", "hash", "git_sha", "enc_image_crc", "data_res" )),
+}
+
+# Reserved fields, not part of reported informations
+HEADER_RESERVED_FIELDS = ( "ctrl_res", "data_res" )
+
+# ------------------------------------------------------------------------
+#   Legacy application header of Revision module V1.x.x
+# ------------------------------------------------------------------------
+
+# Legacy application header size
+# Unit: byte
+LEGACY_HEADER_SIZE = 16
+
+# Legacy application header layout
+LEGACY_HEADER_LAYOUT = ( "I4BII", ( "signature", "sw_major", "sw_minor", "sw_develop", "sw_test", "app_size", "app_crc" ))
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Compile struct for both byte orders
+#
+# @param[in]:    fmt    - Struct format without byte order character
+# @return:       Dict of compiled structs, key is little endian flag
+# ===============================================================================
+def compile_layout(fmt):
+    return { True: struct.Struct( "<" + fmt ), False: struct.Struct( ">" + fmt ) }
+
+# ===============================================================================
+# @brief: Convert version number to string
+#
+# @param[in]:    ver    - Version coded as 0xMMmmddtt
+# @return:       Version string
+# ===============================================================================
+def ver_to_str(ver):
+    return "V%d.%d.%d.%d" % (( ver >> 24 ) & 0xFF, ( ver >> 16 ) & 0xFF, ( ver >> 8 ) & 0xFF, ver & 0xFF )
+
+# ===============================================================================
+# @brief: Get image start address
+#
+#       Custom images define start address in header, otherwise image
+#       starts right after image header.
+#
+# @param[in]:    header         - Image header
+# @param[in]:    header_addr    - Image header address
+# @return:       Image start address
+# ===============================================================================
+def get_image_start(header, header_addr):
+    if header.image_type == IMAGE_TYPE_CUSTOM and header.image_addr != 0:
+        return header.image_addr
+    else:
+        return header_addr + HEADER_SIZE
+
+# ===============================================================================
+# @brief: Calculate CRC8 of image header
+#
+#       All header fields beside CRC itself are part of calculation.
+#
+# @param[in]:    buf    - Packed image header
+# @param[in]:    offset - Offset of image header inside buffer
+# @return:       Image header CRC8
+# ===============================================================================
+def calc_header_crc(buf, offset=0):
+    return get_crc8().calc( memoryview( buf )[offset+HEADER_CRC_OFFSET+1:offset+HEADER_SIZE] )
+
+# ===============================================================================
+# @brief: Check CRC8 of image header
+#
+# @param[in]:    buf    - Packed image header
+# @param[in]:    offset - Offset of image header inside buffer
+# @return:       True if image header CRC is valid
+# ===============================================================================
+def check_header_crc(buf, offset=0):
+    return buf[offset+HEADER_CRC_OFFSET] == calc_header_crc( buf, offset )
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Image header error
+# ===============================================================================
+class ImageHeaderError(Exception):
+    pass
+
+# ===============================================================================
+# @brief: Image header (ver_image_header_t)
+#
+#       Layout is selected by "ctrl.ver" and all fields are decoded with
+#       single unpack directly from inputed buffer.
+# ===============================================================================
+class ImageHeader:
+
+    # Compiled layouts
+    _layouts = { ver: ( compile_layout( fmt ), names ) for ver, ( fmt, names ) in HEADER_LAYOUTS.items() }
+
+    def __init__(self, fields):
+        self.__dict__.update( fields )
+
+    # ===============================================================================
+    # @brief: Decode image header from buffer
+    #
+    # @param[in]:    buf            - Buffer containing image header
+    # @param[in]:    offset         - Offset of image header inside buffer
+    # @param[in]:    little_endian  - Byte order of multi-byte fields
+    # @return:       Image header object
+    # ===============================================================================
+    @classmethod
+    def from_buffer(cls, buf, offset=0, little_endian=True):
+        if len(buf) - offset < HEADER_SIZE:
+            raise ImageHeaderError("image header requires %d bytes, got %d" % ( HEADER_SIZE, len(buf) - offset ))
+
+        ver = buf[offset + HEADER_VER_OFFSET]
+
+        try:
+            structs, names = cls._layouts[ver]
+        except KeyError:
+            raise ImageHeaderError("unknown image header version: %d" % ver)
+
+        return cls( zip( names, structs[little_endian].unpack_from( buf, offset )))
+
+    # ===============================================================================
+    # @brief: Create image header from dictionary
+    #
+    # @param[in]:    fields - Dictionary of header fields, as from "to_dict"
+    # @return:       Image header object
+    # ===============================================================================
+    @classmethod
+    def from_dict(cls, fields):
+        return cls( ( name, bytes.fromhex( value ) if isinstance( value, str ) else value )
+                    for name, value in fields.items() if name in cls._layouts[fields["ver"]][1] )
+
+    # ===============================================================================
+    # @brief: Encode image header
+    #
+    # @param[in]:    little_endian  - Byte order of multi-byte fields
+    # @return:       Packed image header
+    # ===============================================================================
+    def pack(self, little_endian=True):
+        structs, names = self._layouts[self.ver]
+        return structs[little_endian].pack( *[ getattr( self, name ) for name in names ] )
+
+    # ===============================================================================
+    # @brief: Get header fields as dictionary
+    #
+    # @return:       Dictionary of header fields, byte arrays as hex strings
+    # ===============================================================================
+    def to_dict(self):
+        return { name: ( value.hex() if isinstance( value, bytes ) else value ) 
+                 for name, value in self.__dict__.items() if name not in HEADER_RESERVED_FIELDS }
+
+# ===============================================================================
+# @brief: Legacy application header of Revision module V1.x.x
+# ===============================================================================
+class LegacyImageHeader(ImageHeader):
+
+    # Compiled layout
+    _structs, _names = compile_layout( LEGACY_HEADER_LAYOUT[0] ), LEGACY_HEADER_LAYOUT[1]
+
+    # ===============================================================================
+    # @brief: Decode legacy application header from buffer
+    #
+    # @param[in]:    buf            - Buffer containing application header
+    # @param[in]:    offset         - Offset of application header inside buffer
+    # @param[in]:    little_endian  - Byte order of multi-byte fields
+    # @return:       Legacy application header object
+    # ===============================================================================
+    @classmethod
+    def from_buffer(cls, buf, offset=0, little_endian=True):
+        if len(buf) - offset < LEGACY_HEADER_SIZE:
+            raise ImageHeaderError("application header requires %d bytes, got %d" % ( LEGACY_HEADER_SIZE, len(buf) - offset ))
+
+        return cls( zip( cls._names, cls._structs[little_endian].unpack_from( buf, offset )))
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,139 @@
+# ===============================================================================
+# @file:    image_integrity.py
+# @note:    Image integrity calculations
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   CRC32 and SHA256 of image payload calculated in single pass
+#           over large chunks and verified against image header
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import zlib
+
+import timings
+
+from image_header import ImageHeader, HEADER_SIZE, ENC_TYPE_NONE, SIG_TYPE_ECSDA, check_header_crc, get_image_start
+
+# ===============================================================================
+#       INTEGRITY SETTINGS
+# ===============================================================================
+
+# Value of bytes in gaps between image segments
+IMAGE_FILL_BYTE = 0xFF
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Calculate image CRC32 and SHA256
+#
+# @param[in]:    chunks     - Iterable of image payload chunks
+# @param[in]:    use_sha    - Calculate also SHA256
+# @return:       Tuple of (CRC32, SHA256 digest or None)
+# ===============================================================================
+def calc_image_digest(chunks, use_sha=True):
+    crc = 0
+    sha = None
+
+    # Imported only when needed, as it noticeably slows down start-up
+    if use_sha:
+        import hashlib
+        sha = hashlib.sha256()
+
+    with timings.phase( "hash" ):
+        for chunk in chunks:
+            crc = zlib.crc32( chunk, crc )
+            if sha is not None:
+                sha.update( chunk )
+
+    return crc, ( sha.digest() if sha is not None else None )
+
+# ===============================================================================
+# @brief: Calculate CRC32 of encrypted image and CRC32 and SHA256 of
+#         decrypted image in single pass
+#
+# @param[in]:    chunks     - Iterable of encrypted image payload chunks
+# @param[in]:    key        - AES key
+# @param[in]:    iv         - AES-CTR initial counter block
+# @param[in]:    use_sha    - Calculate also SHA256
+# @return:       Tuple of (encrypted CRC32, CRC32, SHA256 digest or None)
+# ===============================================================================
+def calc_encrypted_image_digest(chunks, key, iv, use_sha=True):
+    from image_encryption import iter_decrypted
+
+    enc_crc = 0
+
+    def iter_encrypted():
+        nonlocal enc_crc
+        for chunk in chunks:
+            enc_crc = zlib.crc32( chunk, enc_crc )
+            yield chunk
+
+    crc, sha = calc_image_digest( iter_decrypted( iter_encrypted(), key, iv ), use_sha )
+
+    return enc_crc, crc, sha
+
+# ===============================================================================
+# @brief: Verify image integrity
+#
+#       Exactly "image_size" bytes from image start are checked. On
+#       encrypted images encrypted image CRC is checked, plain image CRC
+#       and hash are checked only when decryption key is given.
+#
+#       Signature is checked only for signed images when public key is
+#       given, using SHA256 calculated in the same pass.
+#
+# @param[in]:    image          - Image reader
+# @param[in]:    header_addr    - Image header address
+# @param[in]:    fill           - Gap fill byte
+# @param[in]:    use_sha        - Check also SHA256, otherwise CRC only
+# @param[in]:    little_endian  - Byte order of multi-byte fields
+# @param[in]:    public_key     - Signature public key, None to skip signature check
+# @param[in]:    enc_key        - AES key of encrypted image, None to skip decryption
+# @param[in]:    enc_iv         - AES-CTR initial counter block
+# @return:       Dictionary of verification results
+# ===============================================================================
+def verify_image(image, header_addr, fill=IMAGE_FILL_BYTE, use_sha=True, little_endian=True, public_key=None, enc_key=None, enc_iv=None):
+    header_buf  = image.read( header_addr, HEADER_SIZE )
+    header      = ImageHeader.from_buffer( header_buf, 0, little_endian )
+    encrypted   = ( header.enc_type != ENC_TYPE_NONE )
+    decrypt     = ( encrypted and enc_key is not None )
+    check_sig   = ( public_key is not None and header.sig_type == SIG_TYPE_ECSDA and ( not encrypted or decrypt ))
+    use_sha     = use_sha or check_sig
+    chunks      = image.read_chunks( get_image_start( header, header_addr ), header.image_size, fill )
+
+    if decrypt:
+        from image_encryption import parse_aes_iv
+        enc_crc, crc, sha = calc_encrypted_image_digest( chunks, enc_key, parse_aes_iv( enc_iv ), use_sha )
+    elif encrypted:
+        enc_crc, _ = calc_image_digest( chunks, use_sha=False )
+        crc, sha = None, None
+    else:
+        crc, sha = calc_image_digest( chunks, use_sha )
+        enc_crc = None
+
+    result = {
+        "header_crc_valid"  : check_header_crc( header_buf ),
+        "image_crc_valid"   : ( crc == header.image_crc ) if crc is not None else None,
+        "hash_valid"        : ( sha == header.hash ) if sha is not None else None,
+        "enc_crc_valid"     : ( enc_crc == header.enc_image_crc ) if enc_crc is not None else None,
+        "signature_valid"   : None,
+        "calc_crc"          : crc,
+        "calc_enc_crc"      : enc_crc,
+        "calc_hash"         : sha.hex() if sha is not None else None,
+    }
+    if check_sig:
+        from image_signature import verify_signature
+        result["signature_valid"] = verify_signature( public_key, header.signature, sha )
+
+    result["valid"] = all( value is not False for key, value in result.items() if key.endswith( "_valid" ))
+
+    return result
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
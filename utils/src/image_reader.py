@@ -0,0 +1,643 @@
+# ===============================================================================
+# @file:    image_reader.py
+# @note:    Windowed reader for Intel HEX and raw binary images
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Reads only requested address windows from output image. Intel HEX
+#           records are streamed and decoded only when overlapping with
+#           requested window, binary files are memory mapped.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import os
+import mmap
+import bisect
+import binascii
+
+import timings
+
+# ===============================================================================
+#       INTEL HEX SETTINGS
+# ===============================================================================
+
+# Record types
+HEX_REC_DATA            = 0x00
+HEX_REC_EOF             = 0x01
+HEX_REC_EXT_SEG_ADDR    = 0x02
+HEX_REC_START_SEG_ADDR  = 0x03
+HEX_REC_EXT_LIN_ADDR    = 0x04
+HEX_REC_START_LIN_ADDR  = 0x05
+
+# Binary file extensions
+BIN_FILE_EXTENSIONS = ( ".bin", )
+
+# Size of chunk when reading large address ranges
+# Unit: byte
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Open image file with matching reader
+#
+# @param[in]:    file       - HEX or BIN image file
+# @param[in]:    base_addr  - Address of first byte in BIN file
+# @return:       Image reader object
+# ===============================================================================
+def open_image(file, base_addr=0):
+    if os.path.splitext(file)[1].lower() in BIN_FILE_EXTENSIONS:
+        return BinReader(file, base_addr)
+    else:
+        return HexReader(file)
+
+# ===============================================================================
+# @brief: Load whole image into memory
+#
+#       Intel HEX files are decoded into segment map once, so whole image
+#       operations do not parse file again. Binary files are memory mapped.
+#
+# @param[in]:    file       - HEX or BIN image file
+# @param[in]:    base_addr  - Address of first byte in BIN file
+# @return:       Image reader object
+# ===============================================================================
+def load_image(file, base_addr=0):
+    with timings.phase( "image_load" ):
+        if os.path.splitext(file)[1].lower() in BIN_FILE_EXTENSIONS:
+            return BinReader(file, base_addr)
+        else:
+            return SegmentMap.from_hex(file)
+
+# ===============================================================================
+# @brief: Iterate over Intel HEX records
+#
+#       Yields absolute address of data records, record type and raw record
+#       line. Data itself is not decoded here, caller decodes only records
+#       it is interested in via "decode_hex_record".
+#
+# @param[in]:    file   - Intel HEX file
+# @return:       Generator of (address, length, record type, line, line number)
+# ===============================================================================
+def iter_hex_records(file):
+    base = 0
+
+    with open(file, "rb") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.rstrip()
+
+            # Skip empty lines
+            if not line:
+                continue
+
+            if line[:1] != b":" or len(line) < 11:
+                raise ImageError("%s:%d: invalid HEX record" % (file, line_num))
+
+            # Length, offset and type decoded with single call
+            try:
+                rec_len, offset_hi, offset_lo, rec_type = binascii.unhexlify( line[1:9] )
+            except binascii.Error:
+                raise ImageError("%s:%d: invalid HEX record" % (file, line_num))
+
+            if rec_type == HEX_REC_DATA:
+                yield base + (( offset_hi << 8 ) | offset_lo ), rec_len, rec_type, line, line_num
+
+            elif rec_type == HEX_REC_EXT_LIN_ADDR:
+                base = int.from_bytes( binascii.unhexlify( line[9:13] ), "big" ) << 16
+
+            elif rec_type == HEX_REC_EXT_SEG_ADDR:
+                base = int.from_bytes( binascii.unhexlify( line[9:13] ), "big" ) << 4
+
+            elif rec_type == HEX_REC_EOF:
+                break
+
+# ===============================================================================
+# @brief: Iterate over decoded Intel HEX data records
+#
+#       Whole record is decoded at once, which is faster than parsing
+#       fields separately when all records are needed.
+#
+# @param[in]:    file   - Intel HEX file
+# @return:       Generator of (address, data)
+# ===============================================================================
+def iter_hex_data(file):
+    base = 0
+
+    with open(file, "rb") as f:
+        for line_num, line in enumerate(f, 1):
+            line = line.rstrip()
+
+            # Skip empty lines
+            if not line:
+                continue
+
+            try:
+                rec = binascii.unhexlify( line[1:] )
+            except binascii.Error:
+                rec = b""
+
+            if line[:1] != b":" or len(rec) < 5 or len(rec) != rec[0] + 5:
+                raise ImageError("%s:%d: invalid HEX record" % (file, line_num))
+
+            if ( sum(rec) & 0xFF ) != 0:
+                raise ImageError("%s:%d: HEX record checksum mismatch" % (file, line_num))
+
+            rec_type = rec[3]
+
+            if rec_type == HEX_REC_DATA:
+                yield base + (( rec[1] << 8 ) | rec[2] ), rec[4:-1]
+
+            elif rec_type == HEX_REC_EXT_LIN_ADDR:
+                base = (( rec[4] << 8 ) | rec[5] ) << 16
+
+            elif rec_type == HEX_REC_EXT_SEG_ADDR:
+                base = (( rec[4] << 8 ) | rec[5] ) << 4
+
+            elif rec_type == HEX_REC_EOF:
+                break
+
+# ===============================================================================
+# @brief: Decode and check data of single Intel HEX record
+#
+# @param[in]:    line   - Raw record line (without line ending)
+# @return:       Record data bytes
+# ===============================================================================
+def decode_hex_record(line):
+    try:
+        rec = binascii.unhexlify( line[1:] )
+    except binascii.Error:
+        raise ImageError("invalid HEX record: %r" % line)
+
+    if ( sum(rec) & 0xFF ) != 0:
+        raise ImageError("HEX record checksum mismatch: %r" % line)
+
+    return rec[4:-1]
+
+# ===============================================================================
+# @brief: Merge overlapping and adjacent address ranges
+#
+# @param[in]:    ranges - Sorted list of (start address, end address) tuples
+# @return:       List of merged ranges
+# ===============================================================================
+def merge_ranges(ranges):
+    merged = []
+
+    for start, end in ranges:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = ( merged[-1][0], max( merged[-1][1], end ))
+        else:
+            merged.append(( start, end ))
+
+    return merged
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Image read error
+# ===============================================================================
+class ImageError(Exception):
+    pass
+
+# ===============================================================================
+# @brief: Intel HEX windowed reader
+#
+#       File is streamed record by record and only records overlapping
+#       requested windows are decoded. Reading stops as soon as all
+#       requested windows are complete.
+# ===============================================================================
+class HexReader:
+
+    def __init__(self, file):
+        self.file = file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    # ===============================================================================
+    # @brief: Read single address window
+    #
+    # @param[in]:    addr   - Start address
+    # @param[in]:    size   - Number of bytes
+    # @param[in]:    fill   - Value of missing bytes, None raises error on gap
+    # @return:       Window data
+    # ===============================================================================
+    def read(self, addr, size, fill=None):
+        return self.read_windows( [( addr, size )], fill )[0]
+
+    # ===============================================================================
+    # @brief: Read multiple address windows in single pass over file
+    #
+    # @param[in]:    windows    - List of (address, size) tuples
+    # @param[in]:    fill       - Value of missing bytes, None raises error on gap
+    # @return:       List of window data, in same order as requested
+    # ===============================================================================
+    def read_windows(self, windows, fill=None):
+        bufs    = [ bytearray([ fill or 0 ]) * size for _, size in windows ]
+        missing = [ size for _, size in windows ]
+        pending = sum( 1 for size in missing if size > 0 )
+
+        for rec_addr, rec_len, _, line, _ in iter_hex_records( self.file ):
+            if pending == 0:
+                break
+
+            rec_end = rec_addr + rec_len
+            data    = None
+
+            for idx, ( win_addr, win_size ) in enumerate( windows ):
+                win_end = win_addr + win_size
+
+                # Record not overlapping with window
+                if rec_addr >= win_end or rec_end <= win_addr or missing[idx] <= 0:
+                    continue
+
+                # Decode only once needed
+                if data is None:
+                    data = decode_hex_record( line )
+
+                start   = max( rec_addr, win_addr )
+                end     = min( rec_end, win_end )
+                bufs[idx][start-win_addr:end-win_addr] = data[start-rec_addr:end-rec_addr]
+
+                missing[idx] -= ( end - start )
+                if missing[idx] <= 0:
+                    pending -= 1
+
+        if fill is None:
+            for idx, ( win_addr, win_size ) in enumerate( windows ):
+                if missing[idx] > 0:
+                    raise ImageError("%s: no data for 0x%08X..0x%08X" % ( self.file, win_addr, win_addr + win_size - 1 ))
+
+        return [ bytes(buf) for buf in bufs ]
+
+    # ===============================================================================
+    # @brief: Read large address range in chunks
+    #
+    #       Range is read in single pass over file. Chunk is yielded as soon
+    #       as it and all preceding chunks are complete, so with records in
+    #       address order only one chunk is held in memory at a time.
+    #
+    # @param[in]:    addr       - Start address
+    # @param[in]:    size       - Number of bytes
+    # @param[in]:    fill       - Value of missing bytes, None raises error on gap
+    # @param[in]:    chunk_size - Size of single chunk
+    # @return:       Generator of data chunks
+    # ===============================================================================
+    def read_chunks(self, addr, size, fill=None, chunk_size=READ_CHUNK_SIZE):
+        end         = addr + size
+        num_chunks  = ( size + chunk_size - 1 ) // chunk_size
+        next_idx    = 0
+
+        # Incomplete chunks, index: [ data, number of missing bytes ]
+        chunks = {}
+
+        for rec_addr, rec_len, _, line, _ in iter_hex_records( self.file ):
+            if next_idx >= num_chunks:
+                break
+
+            # Skip data of already yielded chunks
+            start   = max( rec_addr, addr + next_idx * chunk_size )
+            stop    = min( rec_addr + rec_len, end )
+            if start >= stop:
+                continue
+
+            data = decode_hex_record( line )
+
+            while start < stop:
+                idx         = ( start - addr ) // chunk_size
+                chunk_addr  = addr + idx * chunk_size
+                chunk_stop  = min( chunk_addr + chunk_size, stop )
+
+                if idx not in chunks:
+                    chunk_len   = min( chunk_size, size - idx * chunk_size )
+                    chunks[idx] = [ bytearray([ fill or 0 ]) * chunk_len, chunk_len ]
+
+                chunks[idx][0][start-chunk_addr:chunk_stop-chunk_addr] = data[start-rec_addr:chunk_stop-rec_addr]
+                chunks[idx][1] -= chunk_stop - start
+                start = chunk_stop
+
+            while next_idx in chunks and chunks[next_idx][1] <= 0:
+                yield bytes( chunks.pop( next_idx )[0] )
+                next_idx += 1
+
+        # Remaining chunks contain gaps
+        for idx in range( next_idx, num_chunks ):
+            chunk_addr  = addr + idx * chunk_size
+            chunk_len   = min( chunk_size, size - idx * chunk_size )
+            data, missing = chunks.pop( idx, ( bytearray([ fill or 0 ]) * chunk_len, chunk_len ))
+
+            if missing > 0 and fill is None:
+                raise ImageError("%s: no data for 0x%08X..0x%08X" % ( self.file, chunk_addr, chunk_addr + chunk_len - 1 ))
+
+            yield bytes( data )
+
+    # ===============================================================================
+    # @brief: Get address range covered by image data
+    #
+    #       Records are not decoded, only their address and length are used.
+    #
+    # @return:       Tuple of (first address, last address + 1)
+    # ===============================================================================
+    def extent(self):
+        start   = None
+        end     = None
+
+        for rec_addr, rec_len, _, _, _ in iter_hex_records( self.file ):
+            if rec_len == 0:
+                continue
+            if start is None or rec_addr < start:
+                start = rec_addr
+            if end is None or rec_addr + rec_len > end:
+                end = rec_addr + rec_len
+
+        if start is None:
+            raise ImageError("%s: no data records" % self.file)
+
+        return start, end
+
+    # ===============================================================================
+    # @brief: Get contiguous address ranges covered by image data
+    #
+    #       Records are not decoded, only their address and length are used.
+    #
+    # @return:       Sorted list of (start address, end address) tuples
+    # ===============================================================================
+    def segments(self):
+        ranges = sorted( ( rec_addr, rec_addr + rec_len ) for rec_addr, rec_len, _, _, _ in iter_hex_records( self.file ) if rec_len > 0 )
+
+        return merge_ranges( ranges )
+
+# ===============================================================================
+# @brief: Raw binary reader
+#
+#       File is memory mapped, first byte of file is located at "base_addr".
+# ===============================================================================
+class BinReader:
+
+    def __init__(self, file, base_addr=0):
+        self.file       = file
+        self.base_addr  = base_addr
+        self._f         = open(file, "rb")
+        self._size      = os.fstat( self._f.fileno() ).st_size
+
+        # Zero length file cannot be mapped
+        if self._size > 0:
+            self._mm = mmap.mmap( self._f.fileno(), 0, access=mmap.ACCESS_READ )
+        else:
+            self._mm = b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if isinstance( self._mm, mmap.mmap ):
+            self._mm.close()
+        self._f.close()
+
+    # ===============================================================================
+    # @brief: Read single address window
+    #
+    # @param[in]:    addr   - Start address
+    # @param[in]:    size   - Number of bytes
+    # @param[in]:    fill   - Value of bytes outside file, None raises error
+    # @return:       Window data
+    # ===============================================================================
+    def read(self, addr, size, fill=None):
+        start   = addr - self.base_addr
+        end     = start + size
+
+        if start >= 0 and end <= self._size:
+            return self._mm[start:end]
+
+        if fill is None:
+            raise ImageError("%s: no data for 0x%08X..0x%08X" % ( self.file, addr, addr + size - 1 ))
+
+        buf = bytearray([ fill ]) * size
+        src_start   = max( start, 0 )
+        src_end     = min( end, self._size )
+        if src_start < src_end:
+            buf[src_start-start:src_end-start] = self._mm[src_start:src_end]
+
+        return bytes(buf)
+
+    # ===============================================================================
+    # @brief: Read multiple address windows
+    #
+    # @param[in]:    windows    - List of (address, size) tuples
+    # @param[in]:    fill       - Value of bytes outside file, None raises error
+    # @return:       List of window data, in same order as requested
+    # ===============================================================================
+    def read_windows(self, windows, fill=None):
+        return [ self.read( addr, size, fill ) for addr, size in windows ]
+
+    # ===============================================================================
+    # @brief: Read large address range in chunks
+    #
+    #       Only one chunk of file is held in memory at a time.
+    #
+    # @param[in]:    addr       - Start address
+    # @param[in]:    size       - Number of bytes
+    # @param[in]:    fill       - Value of bytes outside file, None raises error
+    # @param[in]:    chunk_size - Size of single chunk
+    # @return:       Generator of data chunks
+    # ===============================================================================
+    def read_chunks(self, addr, size, fill=None, chunk_size=READ_CHUNK_SIZE):
+        for idx in range( 0, size, chunk_size ):
+            yield self.read( addr + idx, min( chunk_size, size - idx ), fill )
+
+    # ===============================================================================
+    # @brief: Get address range covered by image data
+    #
+    # @return:       Tuple of (first address, last address + 1)
+    # ===============================================================================
+    def extent(self):
+        return self.base_addr, self.base_addr + self._size
+
+    # ===============================================================================
+    # @brief: Get contiguous address ranges covered by image data
+    #
+    # @return:       Sorted list of (start address, end address) tuples
+    # ===============================================================================
+    def segments(self):
+        return [ self.extent() ] if self._size > 0 else []
+
+# ===============================================================================
+# @brief: Sparse image in memory
+#
+#       Image is stored as sorted list of contiguous segments, each backed
+#       by bytearray. Segment containing address is found by bisection and
+#       reads inside single segment return memoryview without copying.
+# ===============================================================================
+class SegmentMap:
+
+    def __init__(self, file=None):
+        self.file = file
+
+        # Segment start addresses and data, sorted by address
+        self._starts    = []
+        self._bufs      = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        pass
+
+    # ===============================================================================
+    # @brief: Decode Intel HEX file into segment map
+    #
+    # @param[in]:    file   - Intel HEX file
+    # @return:       Segment map
+    # ===============================================================================
+    @classmethod
+    def from_hex(cls, file):
+        smap = cls( file )
+
+        for rec_addr, data in iter_hex_data( file ):
+            if not data:
+                continue
+
+            # Fast path, records usually follow each other
+            if smap._bufs and rec_addr == smap._starts[-1] + len( smap._bufs[-1] ):
+                smap._bufs[-1] += data
+            else:
+                smap.write( rec_addr, data )
+
+        return smap
+
+    # ===============================================================================
+    # @brief: Write data, overlapping data is replaced
+    #
+    #       Adjacent and overlapping segments are merged into one.
+    #
+    # @param[in]:    addr   - Start address
+    # @param[in]:    data   - Data to write
+    # @return:       void
+    # ===============================================================================
+    def write(self, addr, data):
+        end = addr + len(data)
+
+        # Range of segments touching written data
+        first = bisect.bisect_right( self._starts, addr ) - 1
+        if first < 0 or self._starts[first] + len( self._bufs[first] ) < addr:
+            first += 1
+        last = bisect.bisect_right( self._starts, end ) - 1
+
+        # New segment
+        if first > last:
+            self._starts.insert( first, addr )
+            self._bufs.insert( first, bytearray( data ))
+            return
+
+        start   = min( self._starts[first], addr )
+        buf     = self._bufs[first]
+
+        # Merge following segments into first one
+        if first < last or addr < self._starts[first]:
+            seg_end = max( self._starts[last] + len( self._bufs[last] ), end )
+            buf     = bytearray( seg_end - start )
+            for idx in range( first, last + 1 ):
+                offset = self._starts[idx] - start
+                buf[offset:offset+len( self._bufs[idx] )] = self._bufs[idx]
+
+            self._starts[first:last+1]  = [ start ]
+            self._bufs[first:last+1]    = [ buf ]
+
+        buf[addr-start:end-start] = data
+
+    # ===============================================================================
+    # @brief: Read single address window
+    #
+    # @param[in]:    addr   - Start address
+    # @param[in]:    size   - Number of bytes
+    # @param[in]:    fill   - Value of missing bytes, None raises error on gap
+    # @return:       Window data as memoryview
+    # ===============================================================================
+    def read(self, addr, size, fill=None):
+        end = addr + size
+        idx = bisect.bisect_right( self._starts, addr ) - 1
+
+        # Window inside single segment
+        if idx >= 0 and end <= self._starts[idx] + len( self._bufs[idx] ):
+            offset = addr - self._starts[idx]
+            return memoryview( self._bufs[idx] )[offset:offset+size]
+
+        if fill is None:
+            raise ImageError("%s: no data for 0x%08X..0x%08X" % ( self.file, addr, end - 1 ))
+
+        buf = bytearray([ fill ]) * size
+        for idx in range( max( idx, 0 ), len( self._starts )):
+            seg_start = self._starts[idx]
+            if seg_start >= end:
+                break
+
+            seg_end = seg_start + len( self._bufs[idx] )
+            start   = max( seg_start, addr )
+            stop    = min( seg_end, end )
+            if start < stop:
+                buf[start-addr:stop-addr] = memoryview( self._bufs[idx] )[start-seg_start:stop-seg_start]
+
+        return memoryview( buf )
+
+    # ===============================================================================
+    # @brief: Read multiple address windows
+    #
+    # @param[in]:    windows    - List of (address, size) tuples
+    # @param[in]:    fill       - Value of missing bytes, None raises error on gap
+    # @return:       List of window data, in same order as requested
+    # ===============================================================================
+    def read_windows(self, windows, fill=None):
+        return [ self.read( addr, size, fill ) for addr, size in windows ]
+
+    # ===============================================================================
+    # @brief: Read large address range in chunks
+    #
+    # @param[in]:    addr       - Start address
+    # @param[in]:    size       - Number of bytes
+    # @param[in]:    fill       - Value of missing bytes, None raises error on gap
+    # @param[in]:    chunk_size - Size of single chunk
+    # @return:       Generator of data chunks
+    # ===============================================================================
+    def read_chunks(self, addr, size, fill=None, chunk_size=READ_CHUNK_SIZE):
+        for idx in range( 0, size, chunk_size ):
+            yield self.read( addr + idx, min( chunk_size, size - idx ), fill )
+
+    # ===============================================================================
+    # @brief: Get address range covered by image data
+    #
+    # @return:       Tuple of (first address, last address + 1)
+    # ===============================================================================
+    def extent(self):
+        if not self._starts:
+            raise ImageError("%s: no data records" % self.file)
+
+        return self._starts[0], self._starts[-1] + len( self._bufs[-1] )
+
+    # ===============================================================================
+    # @brief: Get contiguous address ranges covered by image data
+    #
+    # @return:       Sorted list of (start address, end address) tuples
+    # ===============================================================================
+    def segments(self):
+        return [( start, start + len(buf) ) for start, buf in zip( self._starts, self._bufs )]
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,311 @@
+# ===============================================================================
+# @file:    image_scan.py
+# @note:    Batch scanner of firmware image archive
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Analyzes HEX/BIN images found in directories or glob patterns
+#           in parallel worker processes and streams one JSONL/CSV row
+#           per image
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+import os
+import glob
+import json
+import csv
+import argparse
+import concurrent.futures
+
+from hex_analyzer import analyze_image, read_image_info, get_analysis_params, discover_addresses, parse_addr, HEX_FILE_LITTLE_ENDIAN, ADDR_AUTO
+from image_reader import load_image
+from image_integrity import verify_image, IMAGE_FILL_BYTE
+from result_cache import ResultCache, calc_file_hash, calc_file_state
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# Image file extensions
+IMAGE_FILE_EXTENSIONS = ( ".hex", ".bin" )
+
+# Number of pending jobs per worker
+SCAN_JOBS_PER_WORKER = 4
+
+# CSV output columns
+CSV_FIELDS = ( "file", "status", "error", "header_addr", "sw_ver", "hw_ver", "image_size", "image_crc", "git_sha", "header_crc_valid",
+               "project", "build_config", "branch", "commit_sha", "image_crc_valid", "hash_valid", "enc_crc_valid", "signature_valid" )
+
+# Tool description
+TOOL_DESCRIPTION = \
+"Image Archive Scanner %s" % SCRIPT_VER
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief:   Argument parser
+#
+# @return:       Dictionary of arguments
+# ===============================================================================
+def arg_parser():
+
+    # Arg parser
+    parser = argparse.ArgumentParser( 	description=TOOL_DESCRIPTION,
+                                        epilog="Enjoy the program!")
+
+    # Add arguments
+    parser.add_argument("paths", help="image files, directories or glob patterns",  metavar="path",            type=str,   nargs="+" )
+    parser.add_argument("-ha",  help="image header location (default: auto)",       metavar="app_header_addr", type=str,   required=False,  default=ADDR_AUTO )
+    parser.add_argument("-pa",  help="project info location or \"auto\"",           metavar="proj_info_addr",  type=str,   required=False )
+    parser.add_argument("-b",   help="BIN file base address",                       metavar="bin_base_addr",   type=str,   required=False,  default="0" )
+    parser.add_argument("-j",   help="number of worker processes",                  metavar="workers",         type=int,   required=False,  default=os.cpu_count() )
+    parser.add_argument("-c",   help="result cache directory",                      metavar="cache_dir",       type=str,   required=False )
+    parser.add_argument("-o",   help="output file (default: stdout)",               metavar="out_file",        type=str,   required=False )
+    parser.add_argument("-fmt", help="output format",                               choices=( "jsonl", "csv" ),            required=False,  default="jsonl" )
+    parser.add_argument("-vf",  help="verify image CRC/hash",                       action="store_true",                   required=False )
+    parser.add_argument("-co",  help="verify CRC only, skip SHA256",                action="store_true",                   required=False )
+    parser.add_argument("-k",   help="signature public key file",                   metavar="key_file",        type=str,   required=False )
+    parser.add_argument("-fb",  help="gap fill byte",                               metavar="fill_byte",       type=str,   required=False,  default="%02X" % IMAGE_FILL_BYTE )
+
+    # Get args
+    return vars( parser.parse_args() )
+
+# ===============================================================================
+# @brief: Iterate over image files
+#
+#       Directories are walked recursively, other paths are treated as
+#       glob patterns. Files are yielded as they are found.
+#
+# @param[in]:    paths  - List of files, directories or glob patterns
+# @return:       Generator of image file paths
+# ===============================================================================
+def iter_image_files(paths):
+    for path in paths:
+        if os.path.isdir( path ):
+            for root, _, files in os.walk( path ):
+                for name in sorted( files ):
+                    if os.path.splitext( name )[1].lower() in IMAGE_FILE_EXTENSIONS:
+                        yield os.path.join( root, name )
+        else:
+            for file in glob.iglob( path, recursive=True ):
+                if os.path.isfile( file ):
+                    yield file
+
+# ===============================================================================
+# @brief: Initialize worker process
+#
+#       Public key is loaded once per worker and reused for all images.
+#
+# @param[in]:    key_file   - Signature public key file, None if not used
+# @return:       void
+# ===============================================================================
+def init_worker(key_file):
+    global _public_key
+
+    if key_file is not None:
+        from image_signature import load_public_key
+        _public_key = load_public_key( key_file )
+
+# ===============================================================================
+# @brief: Analyze single image, errors are reported as part of result
+#
+# @param[in]:    file           - Image file
+# @param[in]:    header_addr    - Image header address or ADDR_AUTO
+# @param[in]:    proj_info_addr - Project info address, ADDR_AUTO or None if not used
+# @param[in]:    base_addr      - Address of first byte in BIN file
+# @param[in]:    verify         - Verify image CRC/hash/signature
+# @param[in]:    use_sha        - Check also SHA256, otherwise CRC only
+# @param[in]:    fill           - Gap fill byte
+# @return:       Dictionary of image informations
+# ===============================================================================
+def scan_image(file, header_addr, proj_info_addr, base_addr, verify=False, use_sha=True, fill=IMAGE_FILL_BYTE):
+
+    # Image loaded for discovery, reused for decoding and verification
+    image = None
+
+    try:
+        if ADDR_AUTO in ( header_addr, proj_info_addr ):
+            image = load_image( file, base_addr )
+            header_addr, proj_info_addr = discover_addresses( image, file, header_addr, proj_info_addr )
+
+        if image is not None:
+            info = { "file": file }
+            info.update( read_image_info( image, header_addr, proj_info_addr ))
+        else:
+            info = analyze_image( file, header_addr, proj_info_addr, base_addr )
+
+        info["header_addr"] = header_addr
+        valid = info["header_crc_valid"]
+
+        if verify:
+            if image is None:
+                image = load_image( file, base_addr )
+
+            info["verify"] = verify_image( image, header_addr, fill, use_sha, HEX_FILE_LITTLE_ENDIAN, _public_key )
+            valid = valid and info["verify"]["valid"]
+
+        info["status"] = "OK" if valid else "ERROR"
+    except Exception as e:
+        info = { "file": file, "status": "ERROR", "error": str(e) }
+
+    finally:
+        if image is not None:
+            image.close()
+
+    return info
+
+# ===============================================================================
+# @brief: Analyze single image in worker process
+#
+#       When results are cached, file state (including content hash) is
+#       calculated here, in parallel with other images, before analysis
+#       so it never describes newer content than analyzed.
+#
+# @param[in]:    file       - Image file
+# @param[in]:    get_state  - Calculate file state for result cache
+# @param[in]:    args       - Additional arguments of "scan_image"
+# @return:       Tuple of (image informations, file state or None)
+# ===============================================================================
+def scan_image_job(file, get_state, *args):
+    state = None
+
+    if get_state:
+        try:
+            state = calc_file_state( file )
+        except OSError:
+            pass
+
+    return scan_image( file, *args ), state
+
+# ===============================================================================
+# @brief: Scan images in parallel
+#
+#       Number of pending jobs is bounded, so list of files is never
+#       collected in memory. Results are yielded in order of completion.
+#       Cached results are yielded right away, without worker processes.
+#
+# @param[in]:    files          - Iterable of image files
+# @param[in]:    workers        - Number of worker processes
+# @param[in]:    cache          - Result cache, None if not used
+# @param[in]:    key_file       - Signature public key file, None if not used
+# @param[in]:    args           - Additional arguments of "scan_image"
+# @return:       Generator of image informations
+# ===============================================================================
+def iter_scan_results(files, workers, cache, key_file, *args):
+    files   = iter( files )
+
+    # Verification settings and key are part of cache key
+    params  = json.dumps([ get_analysis_params( *args[:3] ), args[3:], calc_file_hash( key_file ) if key_file is not None else None ])
+
+    # Load key also in main process, so invalid key is reported before workers start
+    init_worker( key_file )
+
+    with concurrent.futures.ProcessPoolExecutor( max_workers=workers, initializer=init_worker, initargs=( key_file, )) as executor:
+        pending = set()
+
+        while True:
+            for file in files:
+                info = cache.get( file, params ) if cache is not None else None
+                if info is not None:
+                    yield info
+                    continue
+
+                pending.add( executor.submit( scan_image_job, file, cache is not None, *args ))
+                if len( pending ) >= workers * SCAN_JOBS_PER_WORKER:
+                    break
+
+            if not pending:
+                break
+
+            done, pending = concurrent.futures.wait( pending, return_when=concurrent.futures.FIRST_COMPLETED )
+            for future in done:
+                info, state = future.result()
+
+                # Failed reads are not cached, file may be still written
+                if cache is not None and "error" not in info and state is not None:
+                    cache.put( info["file"], params, info, state )
+
+                yield info
+
+# ===============================================================================
+# @brief: Format image informations as CSV row
+#
+# @param[in]:    info   - Image informations
+# @return:       CSV row dictionary
+# ===============================================================================
+def csv_row(info):
+    fields = dict( info.get( "build_info", {} ))
+    fields.update( info.get( "verify", {} ))
+    fields.update( info )
+    row = { field: fields.get( field, "" ) for field in CSV_FIELDS }
+
+    for field in ( "header_addr", "sw_ver", "hw_ver", "image_crc" ):
+        if field in info:
+            row[field] = "0x%08X" % info[field]
+
+    return row
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+
+    # Get invocation arguments
+    args = arg_parser()
+
+    header_addr     = parse_addr( args["ha"] )
+    proj_info_addr  = parse_addr( args["pa"] )
+    base_addr       = int( args["b"], 16 )
+    verify          = args["vf"] or args["k"] is not None
+    use_sha         = not args["co"]
+    fill            = int( args["fb"], 16 )
+
+    out = open( args["o"], "w", newline="" ) if args["o"] else sys.stdout
+
+    if args["fmt"] == "csv":
+        writer = csv.DictWriter( out, fieldnames=CSV_FIELDS )
+        writer.writeheader()
+
+    cache = ResultCache( args["c"] ) if args["c"] else None
+
+    failed = 0
+    for info in iter_scan_results( iter_image_files( args["paths"] ), args["j"], cache, args["k"],
+                                   header_addr, proj_info_addr, base_addr, verify, use_sha, fill ):
+        if args["fmt"] == "csv":
+            writer.writerow( csv_row( info ))
+        else:
+            out.write( json.dumps( info ) + "\n" )
+        out.flush()
+
+        if info["status"] != "OK":
+            failed += 1
+
+    if cache is not None:
+        cache.close()
+
+    if out is not sys.stdout:
+        out.close()
+
+    sys.exit( 1 if failed else 0 )
+
+
+# Public key of worker process, loaded by "init_worker"
+_public_key = None
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
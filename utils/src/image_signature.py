@@ -0,0 +1,116 @@
+# ===============================================================================
+# @file:    image_signature.py
+# @note:    Image signature verification
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   ECDSA (NIST P-256) verification of image signature. Signature
+#           is calculated over SHA256 hash of image, therefore hash from
+#           integrity check is reused and image is not read again.
+#
+#           Requires "cryptography" package, imported only when signature
+#           verification is used.
+# ===============================================================================
+
+# ===============================================================================
+#       SIGNATURE SETTINGS
+# ===============================================================================
+
+# Size of ECDSA signature (r & s) and of its components
+# Unit: byte
+SIGNATURE_SIZE      = 64
+SIGNATURE_INT_SIZE  = 32
+
+# Size of raw public key (X & Y coordinates), optionally prefixed with 0x04
+# Unit: byte
+PUBLIC_KEY_RAW_SIZE = 64
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Import cryptography package
+#
+# @return:       Tuple of used cryptography modules
+# ===============================================================================
+def import_cryptography():
+    try:
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec, utils
+        from cryptography.exceptions import InvalidSignature
+    except ImportError:
+        raise ImageSignatureError("signature verification requires \"cryptography\" package (pip install cryptography)")
+
+    return hashes, serialization, ec, utils, InvalidSignature
+
+# ===============================================================================
+# @brief: Load ECDSA public key
+#
+#       Supported formats are PEM, DER and raw X & Y coordinates (binary
+#       or hex string, optionally prefixed with 0x04).
+#
+# @param[in]:    file   - Public key file
+# @return:       Public key object
+# ===============================================================================
+def load_public_key(file):
+    _, serialization, ec, _, _ = import_cryptography()
+
+    with open( file, "rb" ) as f:
+        data = f.read()
+
+    if data.lstrip().startswith( b"-----BEGIN" ):
+        return serialization.load_pem_public_key( data )
+
+    # Raw key as hex string
+    try:
+        raw = bytes.fromhex( data.decode( "ascii" ).strip() )
+    except ( UnicodeDecodeError, ValueError ):
+        raw = data
+
+    if len(raw) == PUBLIC_KEY_RAW_SIZE:
+        raw = b"\x04" + raw
+
+    if len(raw) == PUBLIC_KEY_RAW_SIZE + 1 and raw[0] == 0x04:
+        return ec.EllipticCurvePublicKey.from_encoded_point( ec.SECP256R1(), raw )
+
+    return serialization.load_der_public_key( data )
+
+# ===============================================================================
+# @brief: Verify image signature
+#
+# @param[in]:    public_key - Public key object
+# @param[in]:    signature  - Signature from image header (r & s, big endian)
+# @param[in]:    digest     - SHA256 of image
+# @return:       True if signature is valid
+# ===============================================================================
+def verify_signature(public_key, signature, digest):
+    hashes, _, ec, utils, InvalidSignature = import_cryptography()
+
+    if len(signature) != SIGNATURE_SIZE:
+        return False
+
+    r = int.from_bytes( signature[:SIGNATURE_INT_SIZE], "big" )
+    s = int.from_bytes( signature[SIGNATURE_INT_SIZE:], "big" )
+
+    try:
+        public_key.verify( utils.encode_dss_signature( r, s ), bytes( digest ), ec.ECDSA( utils.Prehashed( hashes.SHA256() )))
+    except InvalidSignature:
+        return False
+
+    return True
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Image signature error
+# ===============================================================================
+class ImageSignatureError(Exception):
+    pass
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,232 @@
+# ===============================================================================
+# @file:    image_stamp.py
+# @note:    Post-build image header stamping
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Fills image header fields marked as "Filled by post-build script"
+#           (image size, CRC32, SHA256, git SHA and header CRC8) and writes
+#           them back into HEX or BIN output file
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+import os
+import shutil
+import binascii
+import subprocess
+import argparse
+
+from image_reader import load_image, iter_hex_records, decode_hex_record, BinReader, ImageError
+from image_header import ImageHeader, ImageHeaderError, HEADER_SIZE, ENC_TYPE_NONE, calc_header_crc, get_image_start
+from image_integrity import calc_image_digest, IMAGE_FILL_BYTE
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# HEX file endiannes
+HEX_FILE_LITTLE_ENDIAN = True
+
+# Git command for commit SHA
+GIT_COMMIT_SHA_CMD = [ "git", "rev-parse", "HEAD" ]
+
+# Tool description
+TOOL_DESCRIPTION = \
+"Image Stamping Tool %s" % SCRIPT_VER
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief:   Argument parser
+#
+# @return:       Dictionary of arguments
+# ===============================================================================
+def arg_parser():
+
+    # Arg parser
+    parser = argparse.ArgumentParser( 	description=TOOL_DESCRIPTION,
+                                        epilog="Enjoy the program!")
+
+    # Add arguments
+    parser.add_argument("-f",   help="HEX or BIN file",                         metavar="image_file",      type=str,   required=True )
+    parser.add_argument("-ha",  help="image header location",                   metavar="app_header_addr", type=str,   required=True )
+    parser.add_argument("-o",   help="output file (default: overwrite input)",  metavar="out_file",        type=str,   required=False )
+    parser.add_argument("-b",   help="BIN file base address",                   metavar="bin_base_addr",   type=str,   required=False,  default="0" )
+    parser.add_argument("-s",   help="image size (default: till end of data)",  metavar="image_size",      type=str,   required=False )
+    parser.add_argument("-g",   help="git commit SHA (default: from git)",      metavar="git_sha",         type=str,   required=False )
+    parser.add_argument("-fb",  help="gap fill byte",                           metavar="fill_byte",       type=str,   required=False,  default="%02X" % IMAGE_FILL_BYTE )
+
+    # Get args
+    return vars( parser.parse_args() )
+
+# ===============================================================================
+# @brief: Convert git commit SHA string to header field value
+#
+# @param[in]:    sha    - Commit SHA as hex string (full or abbreviated)
+# @return:       First 8 bytes of commit SHA
+# ===============================================================================
+def git_sha_to_bytes(sha):
+    return bytes.fromhex( sha.strip()[:16].ljust( 16, "0" ))
+
+# ===============================================================================
+# @brief: Get git commit SHA of current worktree
+#
+# @return:       Commit SHA bytes, zeros if not inside git repository
+# ===============================================================================
+def get_git_sha():
+    try:
+        return git_sha_to_bytes( subprocess.check_output( GIT_COMMIT_SHA_CMD, stderr=subprocess.DEVNULL ).decode("utf-8") )
+    except ( OSError, subprocess.CalledProcessError, ValueError ):
+        return bytes(8)
+
+# ===============================================================================
+# @brief: Stamp image header
+#
+# @param[in]:    image          - Image reader
+# @param[in]:    header_addr    - Image header address
+# @param[in]:    image_size     - Image size, None till end of image data
+# @param[in]:    git_sha        - Git commit SHA bytes
+# @param[in]:    fill           - Gap fill byte
+# @return:       Stamped image header
+# ===============================================================================
+def stamp_image_header(image, header_addr, image_size, git_sha, fill=IMAGE_FILL_BYTE):
+    header      = ImageHeader.from_buffer( image.read( header_addr, HEADER_SIZE ), 0, HEX_FILE_LITTLE_ENDIAN )
+    image_start = get_image_start( header, header_addr )
+
+    if image_size is None:
+        image_size = image.extent()[1] - image_start
+
+    # Image payload
+    chunks = image.read_chunks( image_start, image_size, fill )
+
+    if header.enc_type == ENC_TYPE_NONE:
+        header.image_crc, header.hash = calc_image_digest( chunks )
+        header.enc_image_crc = 0
+
+    # Plain image CRC and hash are provided by encryption tool
+    else:
+        header.enc_image_crc, _ = calc_image_digest( chunks, use_sha=False )
+
+    header.image_size   = image_size
+    header.git_sha      = git_sha
+
+    # Header CRC shall be calculated last
+    header.crc = calc_header_crc( header.pack( HEX_FILE_LITTLE_ENDIAN ))
+
+    return header
+
+# ===============================================================================
+# @brief: Write data into Intel HEX file
+#
+#       Only records overlapping with written data are re-encoded, all
+#       other records are copied as they are.
+#
+# @param[in]:    file       - Input HEX file
+# @param[in]:    out_file   - Output HEX file
+# @param[in]:    addr       - Address of data
+# @param[in]:    data       - Data to write
+# @return:       void
+# ===============================================================================
+def patch_hex_file(file, out_file, addr, data):
+    end     = addr + len(data)
+    patches = {}
+
+    # Find and patch affected records
+    for rec_addr, rec_len, _, line, line_num in iter_hex_records( file ):
+        if rec_addr >= end or rec_addr + rec_len <= addr:
+            continue
+
+        # Check record before modifying it
+        decode_hex_record( line )
+
+        rec     = bytearray( binascii.unhexlify( line[1:-2] ))
+        start   = max( rec_addr, addr )
+        stop    = min( rec_addr + rec_len, end )
+
+        rec[4+start-rec_addr:4+stop-rec_addr] = data[start-addr:stop-addr]
+        rec.append( -sum(rec) & 0xFF )
+
+        patches[line_num] = b":" + binascii.hexlify( rec ).upper()
+
+    # Copy file with patched records
+    tmp_file = out_file + ".tmp"
+    with open( file, "rb" ) as f_in, open( tmp_file, "wb" ) as f_out:
+        for line_num, line in enumerate( f_in, 1 ):
+            if line_num in patches:
+                line = patches[line_num] + line[len(line.rstrip()):]
+            f_out.write( line )
+
+    os.replace( tmp_file, out_file )
+
+# ===============================================================================
+# @brief: Write data into binary file
+#
+# @param[in]:    file       - Input BIN file
+# @param[in]:    out_file   - Output BIN file
+# @param[in]:    offset     - Offset of data inside file
+# @param[in]:    data       - Data to write
+# @return:       void
+# ===============================================================================
+def patch_bin_file(file, out_file, offset, data):
+    if os.path.abspath( file ) != os.path.abspath( out_file ):
+        shutil.copyfile( file, out_file )
+
+    with open( out_file, "r+b" ) as f:
+        f.seek( offset )
+        f.write( data )
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+
+    # Get invocation arguments
+    args = arg_parser()
+
+    file        = args["f"]
+    out_file    = args["o"] or file
+    header_addr = int( args["ha"], 16 )
+    base_addr   = int( args["b"], 16 )
+    image_size  = int( args["s"], 0 ) if args["s"] is not None else None
+    git_sha     = git_sha_to_bytes( args["g"] ) if args["g"] is not None else get_git_sha()
+    fill        = int( args["fb"], 16 )
+
+    try:
+
+        # Calculate header
+        with load_image( file, base_addr ) as image:
+            header  = stamp_image_header( image, header_addr, image_size, git_sha, fill )
+            is_hex  = not isinstance( image, BinReader )
+
+        # Write header back
+        if is_hex:
+            patch_hex_file( file, out_file, header_addr, header.pack( HEX_FILE_LITTLE_ENDIAN ))
+        else:
+            patch_bin_file( file, out_file, header_addr - base_addr, header.pack( HEX_FILE_LITTLE_ENDIAN ))
+
+    except ( ImageError, ImageHeaderError, OSError ) as e:
+        sys.exit( "ERROR: %s" % e )
+
+    print("")
+    print("Image <%s> stamped:" % out_file)
+    print(" -Image size: \t%d bytes" % header.image_size )
+    print(" -Image CRC: \t0x%08X" % header.image_crc )
+    print(" -Header CRC: \t0x%02X" % header.crc )
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,414 @@
+# ===============================================================================
+# @file:    image_watch.py
+# @note:    Watch mode of image analysis
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Monitors output directories and analyzes new or changed images
+#           as soon as they are completely written. Results are kept in
+#           memory and periodically flushed into JSON index file.
+#
+#           Directory changes are reported by inotify on Linux, other
+#           platforms fall back to periodic polling.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+import os
+import json
+import time
+import struct
+import select
+import signal
+import argparse
+
+from image_scan import iter_image_files, scan_image, init_worker, IMAGE_FILE_EXTENSIONS
+from image_integrity import IMAGE_FILL_BYTE
+from hex_analyzer import parse_addr, ADDR_AUTO
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# ===============================================================================
+#       WATCH SETTINGS
+# ===============================================================================
+
+# Time file must stay unchanged before it is analyzed
+# Unit: s
+WATCH_DEBOUNCE_TIME = 0.5
+
+# Period of index file flush
+# Unit: s
+WATCH_FLUSH_PERIOD = 2.0
+
+# Period of directory polling, when inotify is not available
+# Unit: s
+WATCH_POLL_PERIOD = 1.0
+
+# inotify flags and event masks (linux/inotify.h)
+IN_NONBLOCK     = 0o4000
+IN_CLOEXEC      = 0o2000000
+IN_MODIFY       = 0x00000002
+IN_CLOSE_WRITE  = 0x00000008
+IN_MOVED_FROM   = 0x00000040
+IN_MOVED_TO     = 0x00000080
+IN_CREATE       = 0x00000100
+IN_DELETE       = 0x00000200
+IN_Q_OVERFLOW   = 0x00004000
+IN_ISDIR        = 0x40000000
+
+# Watched events
+IN_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# inotify event header: wd, mask, cookie, name length
+INOTIFY_EVENT = struct.Struct( "iIII" )
+
+# Size of inotify read buffer
+# Unit: byte
+INOTIFY_BUF_SIZE = 64 * 1024
+
+# Event kinds
+EVENT_CHANGED   = "changed"
+EVENT_REMOVED   = "removed"
+EVENT_RESCAN    = "rescan"
+
+# Tool description
+TOOL_DESCRIPTION = \
+"Image Watch %s" % SCRIPT_VER
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief:   Argument parser
+#
+# @return:       Dictionary of arguments
+# ===============================================================================
+def arg_parser():
+
+    # Arg parser
+    parser = argparse.ArgumentParser( 	description=TOOL_DESCRIPTION,
+                                        epilog="Enjoy the program!")
+
+    # Add arguments
+    parser.add_argument("paths", help="watched directories",                       metavar="dir",             type=str,   nargs="+" )
+    parser.add_argument("-ha",  help="image header location (default: auto)",       metavar="app_header_addr", type=str,   required=False,  default=ADDR_AUTO )
+    parser.add_argument("-pa",  help="project info location or \"auto\"",           metavar="proj_info_addr",  type=str,   required=False )
+    parser.add_argument("-b",   help="BIN file base address",                       metavar="bin_base_addr",   type=str,   required=False,  default="0" )
+    parser.add_argument("-vf",  help="verify image CRC/hash",                       action="store_true",                   required=False )
+    parser.add_argument("-co",  help="verify CRC only, skip SHA256",                action="store_true",                   required=False )
+    parser.add_argument("-k",   help="signature public key file",                   metavar="key_file",        type=str,   required=False )
+    parser.add_argument("-fb",  help="gap fill byte",                               metavar="fill_byte",       type=str,   required=False,  default="%02X" % IMAGE_FILL_BYTE )
+    parser.add_argument("-o",   help="index file",                                  metavar="index_file",      type=str,   required=False,  default="image_index.json" )
+    parser.add_argument("-d",   help="debounce time in seconds",                    metavar="debounce",        type=float, required=False,  default=WATCH_DEBOUNCE_TIME )
+    parser.add_argument("-i",   help="index flush period in seconds",               metavar="flush_period",    type=float, required=False,  default=WATCH_FLUSH_PERIOD )
+    parser.add_argument("-p",   help="use polling instead of inotify",              action="store_true",                   required=False )
+
+    # Get args
+    return vars( parser.parse_args() )
+
+# ===============================================================================
+# @brief: Check if file is image file
+#
+# @param[in]:    path   - File path
+# @return:       True if file has image extension
+# ===============================================================================
+def is_image_file(path):
+    return os.path.splitext( path )[1].lower() in IMAGE_FILE_EXTENSIONS
+
+# ===============================================================================
+# @brief: Get file state used for change detection
+#
+# @param[in]:    path   - File path
+# @return:       Tuple of (size, modification time), None if file does not exist
+# ===============================================================================
+def get_file_state(path):
+    try:
+        st = os.stat( path )
+    except OSError:
+        return None
+
+    return st.st_size, st.st_mtime_ns
+
+# ===============================================================================
+# @brief: Create directory watcher
+#
+#       Inotify is used only on Linux, elsewhere (or when it is not
+#       available) directories are polled.
+#
+# @param[in]:    dirs       - Watched directories
+# @param[in]:    polling    - Force polling watcher
+# @return:       Directory watcher
+# ===============================================================================
+def create_watcher(dirs, polling=False):
+    if not polling and sys.platform.startswith( "linux" ):
+        try:
+            return InotifyWatcher( dirs )
+        except ( OSError, TypeError, AttributeError ):
+            pass
+
+    return PollWatcher( dirs )
+
+# ===============================================================================
+# @brief: Write index file
+#
+#       Index is written to temporary file first, so readers never see
+#       partially written index.
+#
+# @param[in]:    file   - Index file
+# @param[in]:    index  - Dictionary of image informations by path
+# @return:       void
+# ===============================================================================
+def write_index(file, index):
+    tmp_file = file + ".tmp"
+
+    with open( tmp_file, "w" ) as f:
+        json.dump( { "updated": time.time(), "images": index }, f )
+
+    os.replace( tmp_file, file )
+
+# ===============================================================================
+# @brief: Watch directories and analyze images
+#
+# @param[in]:    watcher        - Directory watcher
+# @param[in]:    index_file     - Index file
+# @param[in]:    debounce       - Time file must stay unchanged before analysis
+# @param[in]:    flush_period   - Period of index file flush
+# @param[in]:    args           - Additional arguments of "scan_image"
+# @return:       void
+# ===============================================================================
+def watch(watcher, index_file, debounce, flush_period, *args):
+    index       = {}
+    pending     = {}
+    dirty       = True
+    last_flush  = 0.0
+
+    # Images present at start
+    for file in iter_image_files( watcher.dirs ):
+        pending[file] = ( 0.0, get_file_state( file ))
+
+    try:
+        while True:
+            events  = watcher.wait( debounce if pending else flush_period )
+            now     = time.monotonic()
+
+            for kind, path in events:
+                if kind == EVENT_RESCAN:
+                    for file in iter_image_files( watcher.dirs ):
+                        pending[file] = ( now, get_file_state( file ))
+
+                elif not is_image_file( path ):
+                    continue
+
+                elif kind == EVENT_REMOVED:
+                    pending.pop( path, None )
+                    if index.pop( path, None ) is not None:
+                        dirty = True
+
+                else:
+                    pending[path] = ( now, get_file_state( path ))
+
+            # Analyze files that stayed unchanged for debounce time
+            for path, ( changed, state ) in list( pending.items() ):
+                if now - changed < debounce:
+                    continue
+
+                current = get_file_state( path )
+                if current is None:
+                    del pending[path]
+                elif current != state:
+                    pending[path] = ( now, current )
+                else:
+                    del pending[path]
+                    info = scan_image( path, *args )
+                    index[path] = info
+                    dirty = True
+
+                    sys.stdout.write( json.dumps( info ) + "\n" )
+                    sys.stdout.flush()
+
+            if dirty and now - last_flush >= flush_period:
+                write_index( index_file, index )
+                dirty       = False
+                last_flush  = now
+
+    except KeyboardInterrupt:
+        pass
+
+    finally:
+        write_index( index_file, index )
+        watcher.close()
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+
+    # Get invocation arguments
+    args = arg_parser()
+
+    header_addr     = parse_addr( args["ha"] )
+    proj_info_addr  = parse_addr( args["pa"] )
+    base_addr       = int( args["b"], 16 )
+    verify          = args["vf"] or args["k"] is not None
+    use_sha         = not args["co"]
+    fill            = int( args["fb"], 16 )
+
+    # Key is loaded once
+    init_worker( args["k"] )
+
+    # Stop on termination request same as on interrupt, so index is flushed
+    signal.signal( signal.SIGTERM, signal.default_int_handler )
+
+    watch( create_watcher( args["paths"], args["p"] ), args["o"], args["d"], args["i"],
+           header_addr, proj_info_addr, base_addr, verify, use_sha, fill )
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Directory watcher based on Linux inotify
+#
+#       Subdirectories are watched as well, including ones created while
+#       watching.
+# ===============================================================================
+class InotifyWatcher:
+
+    def __init__(self, dirs):
+        import ctypes
+        import ctypes.util
+
+        self.dirs   = dirs
+        self._libc  = ctypes.CDLL( ctypes.util.find_library( "c" ), use_errno=True )
+
+        if not hasattr( self._libc, "inotify_init1" ):
+            raise OSError("inotify not available")
+
+        self._fd = self._libc.inotify_init1( IN_NONBLOCK | IN_CLOEXEC )
+        if self._fd < 0:
+            raise OSError( ctypes.get_errno(), "inotify_init1 failed" )
+
+        # Watched directory of each watch descriptor
+        self._wds = {}
+
+        for path in dirs:
+            self._add_tree( path )
+
+    def close(self):
+        os.close( self._fd )
+
+    # ===============================================================================
+    # @brief: Watch directory and its subdirectories
+    #
+    # @param[in]:    path   - Directory
+    # @return:       void
+    # ===============================================================================
+    def _add_tree(self, path):
+        for root, _, _ in os.walk( path ):
+            wd = self._libc.inotify_add_watch( self._fd, os.fsencode( root ), IN_WATCH_MASK )
+            if wd >= 0:
+                self._wds[wd] = root
+
+    # ===============================================================================
+    # @brief: Wait for directory changes
+    #
+    # @param[in]:    timeout    - Max. waiting time in seconds
+    # @return:       List of (event kind, path) tuples
+    # ===============================================================================
+    def wait(self, timeout):
+        events = []
+
+        ready, _, _ = select.select( [ self._fd ], [], [], timeout )
+        if not ready:
+            return events
+
+        try:
+            buf = os.read( self._fd, INOTIFY_BUF_SIZE )
+        except BlockingIOError:
+            return events
+
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, name_len = INOTIFY_EVENT.unpack_from( buf, offset )
+            name    = os.fsdecode( buf[offset+INOTIFY_EVENT.size:offset+INOTIFY_EVENT.size+name_len].rstrip( b"\0" ))
+            offset += INOTIFY_EVENT.size + name_len
+
+            # Events were lost, all files must be checked
+            if mask & IN_Q_OVERFLOW:
+                events.append(( EVENT_RESCAN, None ))
+                continue
+
+            if wd not in self._wds:
+                continue
+
+            path = os.path.join( self._wds[wd], name )
+
+            if mask & IN_ISDIR:
+                if mask & ( IN_CREATE | IN_MOVED_TO ):
+                    self._add_tree( path )
+                    events.extend( ( EVENT_CHANGED, file ) for file in iter_image_files([ path ]) )
+
+            elif mask & ( IN_DELETE | IN_MOVED_FROM ):
+                events.append(( EVENT_REMOVED, path ))
+
+            else:
+                events.append(( EVENT_CHANGED, path ))
+
+        return events
+
+# ===============================================================================
+# @brief: Directory watcher based on periodic polling
+# ===============================================================================
+class PollWatcher:
+
+    def __init__(self, dirs, period=WATCH_POLL_PERIOD):
+        self.dirs       = dirs
+        self.period     = period
+        self._states    = self._scan()
+
+    def close(self):
+        pass
+
+    # ===============================================================================
+    # @brief: Get state of all image files
+    #
+    # @return:       Dictionary of file states by path
+    # ===============================================================================
+    def _scan(self):
+        return { file: get_file_state( file ) for file in iter_image_files( self.dirs ) }
+
+    # ===============================================================================
+    # @brief: Wait for directory changes
+    #
+    # @param[in]:    timeout    - Max. waiting time in seconds
+    # @return:       List of (event kind, path) tuples
+    # ===============================================================================
+    def wait(self, timeout):
+        time.sleep( min( timeout, self.period ))
+
+        states  = self._scan()
+        events  = [( EVENT_CHANGED, file ) for file, state in states.items() if self._states.get( file ) != state ]
+        events += [( EVENT_REMOVED, file ) for file in self._states if file not in states ]
+
+        self._states = states
+
+        return events
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -11,13 +11,16 @@
 # ===============================================================================
 #       IMPORTS  
 # ===============================================================================
-from distutils.command.build import build
 import sys
 import os
+import string
+import hashlib
 import subprocess
 import argparse
 import datetime
 
+import timings
+
 # ===============================================================================
 #       SCRIPT VERSIONING
 # ===============================================================================
@@ -37,13 +40,17 @@ STRING_TERMINATION = ""
 # New line
 NEWLINE = str("\\r\\n\\\n")
 
+# Generated file lines changing on every generation, ignored when
+# comparing with existing file
+VOLATILE_LINE_PREFIXES = ( "*@date", "*@time" )
+
 # Git commands
-GIT_USER_NAME_CMD       = "git config user.name"
-GIT_USER_EMAIL_CMD      = "git config user.email"
-GIT_CURRENT_BRANCH_CMD  = "git rev-parse --abbrev-ref HEAD"
-GIT_WORKTREE_STATUS_CMD = "git status --porcelain"
-GIT_COMMIT_SHA_CMD      = "git rev-parse --short HEAD"
-GIT_ORIGIN_CMD          = "git config --get remote.origin.url"
+# NOTE: Both commands are executed concurrently
+GIT_REV_PARSE_CMD       = [ "git", "rev-parse", "HEAD", "--abbrev-ref", "HEAD" ]
+GIT_CONFIG_CMD          = [ "git", "config", "-z", "--get-regexp", r"^(user\.(name|email)|remote\.origin\.url)$" ]
+
+# Length of abbreviated commit SHA
+GIT_COMMIT_SHA_LEN      = 7
 
 # Tool description
 TOOL_DESCRIPTION = \
@@ -56,6 +63,113 @@ TOOL_DESCRIPTION = \
 # Author
 FILE_AUTHOR = "Ziga Miklosic"
 
+# Source file template
+PROJ_INFO_C_TEMPLATE = string.Template(r"""// Copyright (c) 2022 Ziga Miklosic
+// All Rights Reserved
+// This software is under MIT licence (https://opensource.org/licenses/MIT)
+////////////////////////////////////////////////////////////////////////////////
+/*!
+*@file      proj_info.c
+*@brief     Project informations
+*@author    ${author}
+${timestamp}*
+*@note     This is automatically generated file!
+*/
+////////////////////////////////////////////////////////////////////////////////
+/*!
+ * @addtogroup PROJ_INFO
+ * @{ <!-- BEGIN GROUP -->
+ */
+////////////////////////////////////////////////////////////////////////////////
+
+////////////////////////////////////////////////////////////////////////////////
+// Includes
+////////////////////////////////////////////////////////////////////////////////
+#include <stdint.h>
+#include <stdlib.h>
+
+#include "proj_info.h"
+#include "../../version_cfg.h"
+
+////////////////////////////////////////////////////////////////////////////////
+// Definitions
+////////////////////////////////////////////////////////////////////////////////
+
+////////////////////////////////////////////////////////////////////////////////
+// Variables
+////////////////////////////////////////////////////////////////////////////////
+
+/**
+ *   Project information string
+ */
+static volatile const char __attribute__ (( section( VER_APP_PROJ_INFO_SECTION ))) gs_proj_info[VER_APP_PROJ_INFO_SIZE] = "\
+${proj_info}";
+
+////////////////////////////////////////////////////////////////////////////////
+// Functions
+////////////////////////////////////////////////////////////////////////////////
+
+////////////////////////////////////////////////////////////////////////////////
+/**
+ * 	@brief		Get build info string
+ *
+ * @return 		gs_proj_info - Project information string
+ */
+////////////////////////////////////////////////////////////////////////////////
+const char* proj_info_get_str(void)
+{
+    return (const char*) gs_proj_info;
+}
+
+////////////////////////////////////////////////////////////////////////////////
+/*!
+ * @} <!-- END GROUP -->
+ */
+////////////////////////////////////////////////////////////////////////////////
+
+""")
+
+# Header file template
+PROJ_INFO_H_TEMPLATE = string.Template(r"""// Copyright (c) 2022 Ziga Miklosic
+// All Rights Reserved
+// This software is under MIT licence (https://opensource.org/licenses/MIT)
+////////////////////////////////////////////////////////////////////////////////
+/*!
+*@file      proj_info.h
+*@brief     Project informations
+*@author    ${author}
+${timestamp}*
+*@note     This is automatically generated file!
+*/
+////////////////////////////////////////////////////////////////////////////////
+/*!
+ * @addtogroup PROJ_INFO
+ * @{ <!-- BEGIN GROUP -->
+ */
+////////////////////////////////////////////////////////////////////////////////
+#ifndef __PROJ_INFO_H_
+#define __PROJ_INFO_H_ 
+
+////////////////////////////////////////////////////////////////////////////////
+// Includes
+////////////////////////////////////////////////////////////////////////////////
+#include <stdint.h>
+ 
+////////////////////////////////////////////////////////////////////////////////
+// Functions
+////////////////////////////////////////////////////////////////////////////////
+const char* proj_info_get_str(void);
+
+#endif // __PROJ_INFO_H_
+
+////////////////////////////////////////////////////////////////////////////////
+/*!
+ * @} <!-- END GROUP -->
+ */
+////////////////////////////////////////////////////////////////////////////////
+ 
+""")
+
 
 # ===============================================================================
 #       FUNCTIONS
@@ -79,6 +193,9 @@ def arg_parser():
     parser.add_argument("-c",   help="used build configuration",        metavar="build_cfg",        type=str,   required=False )
     parser.add_argument("-pc",  help="computer name",                   metavar="pc_name",          type=str,   required=False )
     parser.add_argument("-os",  help="host OS",                         metavar="host_os",          type=str,   required=False )
+    parser.add_argument("-nt",  help="omit date & time from generated files",   action="store_true",                required=False )
+    parser.add_argument("-fw",  help="write files even if content unchanged",   action="store_true",                required=False )
+    parser.add_argument("-t",   help="generate file from user template",        metavar=( "template", "out_file" ), nargs=2, action="append", default=[] )
 
     # Get args
     args = parser.parse_args()
@@ -92,8 +209,53 @@ def arg_parser():
     build_cfg       = args["c"]
     pc_name         = args["pc"]
     host_os         = args["os"]
+    timestamp       = not args["nt"]
+    force_write     = args["fw"]
+    templates       = args["t"]
+
+    return file, sw_proj_name, build_cfg, pc_name, host_os, timestamp, force_write, templates
+
+# ===============================================================================
+# @brief: Run commands concurrently
+#
+# @param[in]:   cmds    - List of commands
+# @return:      List of command outputs, empty string for failed command
+# ===============================================================================
+def run_concurrently(cmds):
+    procs = [ subprocess.Popen( cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL ) for cmd in cmds ]
+    outs  = []
+
+    for proc in procs:
+        out, _ = proc.communicate()
+        outs.append( out.decode("utf-8") if proc.returncode == 0 else "" )
 
-    return file, sw_proj_name, build_cfg, pc_name, host_os
+    return outs
+
+# ===============================================================================
+# @brief: Get git informations
+#
+#       All informations are acquired with two concurrent git invocations.
+#
+# @return:      Dictionary of git informations, empty if not available
+# ===============================================================================
+def get_git_info():
+    with timings.phase( "git" ):
+        rev_parse, config = run_concurrently([ GIT_REV_PARSE_CMD, GIT_CONFIG_CMD ])
+
+    # Commit SHA and branch
+    revs = rev_parse.split("\n")
+    git_info = {
+        "commit_sha"    : revs[0][:GIT_COMMIT_SHA_LEN] if len(revs) > 1 else "",
+        "branch"        : revs[1] if len(revs) > 1 else "",
+    }
+
+    # Config entries are NUL terminated "key\nvalue" pairs
+    config = dict( entry.partition("\n")[::2] for entry in config.split("\0") if entry )
+    git_info["name"]    = config.get( "user.name", "" )
+    git_info["email"]   = config.get( "user.email", "" )
+    git_info["origin"]  = config.get( "remote.origin.url", "" )
+
+    return git_info
 
 # ===============================================================================
 # @brief: Create build info
@@ -102,16 +264,19 @@ def arg_parser():
 # @param[in]:   build_cfg       - Build configuration
 # @param[in]:   pc_name         - Name of PC where SW is being build
 # @param[in]:   host_os         - Host PC OS name
-# @return:      void
+# @param[in]:   git_info        - Git informations, None to acquire them
+# @return:      Build information string
 # ===============================================================================
-def create_build_info(sw_proj_name, build_cfg, pc_name, host_os):
+def create_build_info(sw_proj_name, build_cfg, pc_name, host_os, git_info=None):
+
+    if git_info is None:
+        git_info    = get_git_info()
 
-    git_name        = subprocess.check_output( GIT_USER_NAME_CMD ).decode("utf-8")[:-1] 
-    git_email       = subprocess.check_output( GIT_USER_EMAIL_CMD ).decode("utf-8")[:-1] 
-    git_branch      = subprocess.check_output( GIT_CURRENT_BRANCH_CMD ).decode("utf-8")[:-1] 
-    git_worktree    = subprocess.check_output( GIT_WORKTREE_STATUS_CMD ).decode("utf-8")[:-1] 
-    commit_sha      = subprocess.check_output( GIT_COMMIT_SHA_CMD ).decode("utf-8")[:-1] 
-    git_origin      = subprocess.check_output( GIT_ORIGIN_CMD ).decode("utf-8")[:-1] 
+    git_name        = git_info["name"]
+    git_email       = git_info["email"]
+    git_branch      = git_info["branch"]
+    commit_sha      = git_info["commit_sha"]
+    git_origin      = git_info["origin"]
 
     build_info_str = \
     "================================================="             + NEWLINE +\
@@ -139,170 +304,131 @@ def create_build_info(sw_proj_name, build_cfg, pc_name, host_os):
     return build_info_str
 
 # ===============================================================================
-# @brief: Write C file header
+# @brief: Get date & time lines of generated file header
 #
-# @param[in]:   file    - Output generated file
-# @return:      void
-# ===============================================================================
-def write_c_file_header(file):
-    file.write("// Copyright (c) 2022 Ziga Miklosic\n")
-    file.write("// All Rights Reserved\n")
-    file.write("// This software is under MIT licence (https://opensource.org/licenses/MIT)\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write("*@file      proj_info.c\n")
-    file.write("*@brief     Project informations\n")
-    file.write("*@author    %s\n" % FILE_AUTHOR )
-    file.write("*@date      %02d.%02d.%04d\n" % ( datetime.date.today().day, datetime.date.today().month, datetime.date.today().year ))
-    file.write("*@time      %02d:%02d:%02d\n" % ( datetime.datetime.now().hour, datetime.datetime.now().minute, datetime.datetime.now().second ))
-    file.write("*\n");
-    file.write("*@note     This is automatically generated file!\n")
-    file.write("*/\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write(" * @addtogroup PROJ_INFO\n")
-    file.write(" * @{ <!-- BEGIN GROUP -->\n")
-    file.write(" */\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Includes\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("#include <stdint.h>\n")
-    file.write("#include <stdlib.h>\n")
-    file.write("\n")
-    file.write("#include \"proj_info.h\"\n")
-    file.write("#include \"../../version_cfg.h\"\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Definitions\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Variables\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("\n")
-    file.write("/**\n")
-    file.write(" *   Project information string\n")
-    file.write(" */\n")
-    file.write("static volatile const char __attribute__ (( section( VER_APP_PROJ_INFO_SECTION ))) gs_proj_info[VER_APP_PROJ_INFO_SIZE] = \"\\\n")
-
-# ===============================================================================
-# @brief: Write C file footer
+# @param[in]:   now     - Date & time of generation, None to omit
+# @return:      Date & time lines
+# ===============================================================================
+def get_timestamp_lines(now):
+    if now is None:
+        return ""
+
+    return "*@date      %02d.%02d.%04d\n*@time      %02d:%02d:%02d\n" % ( now.day, now.month, now.year, now.hour, now.minute, now.second )
+
+# ===============================================================================
+# @brief: Create template fields
 #
-# @param[in]:   file    - Output generated file
-# @return:      void
-# ===============================================================================
-def write_c_file_footer(file):
-    file.write("\";\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Functions\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/**\n")
-    file.write(" * 	@brief		Get build info string\n")
-    file.write(" *\n")
-    file.write(" * @return 		gs_proj_info - Project information string\n")
-    file.write(" */\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("const char* proj_info_get_str(void)\n")
-    file.write("{\n")
-    file.write("    return (const char*) gs_proj_info;\n")
-    file.write("}\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write(" * @} <!-- END GROUP -->\n")
-    file.write(" */\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("\n")
-
-# ===============================================================================
-# @brief: Create C file
+#       Fields are available in all templates as ${name} placeholders.
 #
-# @param[in]:   file        - Output generated file
-# @param[in]:   build_info  - Build information
-# @return:      void
+# @param[in]:   build_info      - Build information string
+# @param[in]:   sw_proj_name    - SW project name
+# @param[in]:   build_cfg       - Build configuration
+# @param[in]:   pc_name         - Name of PC where SW is being build
+# @param[in]:   host_os         - Host PC OS name
+# @param[in]:   git_info        - Git informations
+# @param[in]:   timestamp       - Include date & time of generation
+# @return:      Dictionary of template fields
+# ===============================================================================
+def create_template_fields(build_info, sw_proj_name, build_cfg, pc_name, host_os, git_info, timestamp=True):
+
+    # Single snapshot of date & time for all generated files
+    now = datetime.datetime.now()
+
+    return {
+        "proj_info"     : build_info,
+        "author"        : FILE_AUTHOR,
+        "timestamp"     : get_timestamp_lines( now if timestamp else None ),
+        "date"          : "%02d.%02d.%04d" % ( now.day, now.month, now.year ),
+        "time"          : "%02d:%02d:%02d" % ( now.hour, now.minute, now.second ),
+        "script_ver"    : SCRIPT_VER,
+        "project"       : str(sw_proj_name),
+        "build_cfg"     : str(build_cfg),
+        "pc_name"       : str(pc_name),
+        "host_os"       : str(host_os),
+        "git_name"      : git_info["name"],
+        "git_email"     : git_info["email"],
+        "git_origin"    : git_info["origin"],
+        "git_branch"    : git_info["branch"],
+        "commit_sha"    : git_info["commit_sha"],
+    }
+
+# ===============================================================================
+# @brief: Load user template
+#
+# @param[in]:   file    - Template file
+# @return:      Compiled template
 # ===============================================================================
-def create_c_file(file, build_info):
-    write_c_file_header(file)
-    file.write(build_info)
-    write_c_file_footer(file)
+def load_template(file):
+    with open(file, "r") as f:
+        return string.Template( f.read() )
 
 # ===============================================================================
-# @brief: Create H file
+# @brief: Calculate hash of generated file content
+#
+#       Volatile lines (date & time of generation) are not part of hash.
 #
-# @param[in]:   file    - Output generated file
-# @return:      void
-# ===============================================================================
-def create_h_file(file):
-    file.write("// Copyright (c) 2022 Ziga Miklosic\n")
-    file.write("// All Rights Reserved\n")
-    file.write("// This software is under MIT licence (https://opensource.org/licenses/MIT)\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write("*@file      proj_info.h\n")
-    file.write("*@brief     Project informations\n")
-    file.write("*@author    %s\n" % FILE_AUTHOR )
-    file.write("*@date      %02d.%02d.%04d\n" % ( datetime.date.today().day, datetime.date.today().month, datetime.date.today().year ))
-    file.write("*@time      %02d:%02d:%02d\n" % ( datetime.datetime.now().hour, datetime.datetime.now().minute, datetime.datetime.now().second ))
-    file.write("*\n");
-    file.write("*@note     This is automatically generated file!\n")
-    file.write("*/\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write(" * @addtogroup PROJ_INFO\n")
-    file.write(" * @{ <!-- BEGIN GROUP -->\n")
-    file.write(" */\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("#ifndef __PROJ_INFO_H_\n")
-    file.write("#define __PROJ_INFO_H_ \n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Includes\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("#include <stdint.h>\n")
-    file.write(" \n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("// Functions\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("const char* proj_info_get_str(void);\n")
-    file.write("\n")
-    file.write("#endif // __PROJ_INFO_H_\n")
-    file.write("\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write("/*!\n")
-    file.write(" * @} <!-- END GROUP -->\n")
-    file.write(" */\n")
-    file.write("////////////////////////////////////////////////////////////////////////////////\n")
-    file.write(" \n")
+# @param[in]:   content - File content
+# @return:      Content hash
+# ===============================================================================
+def calc_content_hash(content):
+    sha = hashlib.sha256()
+
+    for line in content.splitlines():
+        if not line.startswith( VOLATILE_LINE_PREFIXES ):
+            sha.update( line.encode("utf-8") + b"\n" )
+
+    return sha.digest()
 
 # ===============================================================================
-# @brief: Create and write project info to files
+# @brief: Write file only if its content changed
+#
+#       Content is written to temporary file first and then renamed into
+#       place, so compiler never sees partially written file.
 #
-# @param[in]:   file    - Output generated file
-# @return:      void
+# @param[in]:   file        - Output generated file
+# @param[in]:   content     - File content
+# @param[in]:   force_write - Write file even if content is unchanged
+# @return:      True if file was written
 # ===============================================================================
-def write_proj_info(file, build_info):
+def write_if_changed(file, content, force_write=False):
+    with timings.phase( "file_write" ):
+        if not force_write and os.path.isfile(file):
+            with open(file, "r") as f:
+                if calc_content_hash( f.read() ) == calc_content_hash( content ):
+                    return False
+
+        tmp_file = file + ".tmp"
+        with open(tmp_file, "w") as f:
+            f.write(content)
+        os.replace(tmp_file, file)
 
-    # Create/Open Source file
-    build_info_c = open(file, "w")
+    return True
 
-    # Create/Open Header file
-    h_file = file[:-1] + "h"
-    build_info_h = open(h_file, "w")
+# ===============================================================================
+# @brief: Create and write project info to files
+#
+#       Files are rendered in memory first and written only if their
+#       content changed, so unchanged files keep their modification time
+#       and do not trigger re-compilation.
+#
+# @param[in]:   file        - Output generated file
+# @param[in]:   fields      - Template fields
+# @param[in]:   force_write - Write files even if content is unchanged
+# @param[in]:   templates   - List of additional (template, output file) pairs
+# @return:      Number of written files
+# ===============================================================================
+def write_proj_info(file, fields, force_write=False, templates=()):
 
-    # Create source file
-    create_c_file(build_info_c, build_info)
+    # Source & header file
+    h_file   = file[:-1] + "h"
+    written  = write_if_changed(file, PROJ_INFO_C_TEMPLATE.safe_substitute(fields), force_write)
+    written += write_if_changed(h_file, PROJ_INFO_H_TEMPLATE.safe_substitute(fields), force_write)
 
-    # Create header file
-    create_h_file(build_info_h)
+    # User templates
+    for template, out_file in templates:
+        written += write_if_changed(out_file, load_template(template).safe_substitute(fields), force_write)
 
-    # Close file
-    build_info_c.close()
-    build_info_h.close()
+    return written
 
 
 # ===============================================================================
@@ -313,19 +439,24 @@ def write_proj_info(file, build_info):
 def main():
     
     # Get invocation arguments
-    file, sw_proj_name, build_cfg, pc_name, host_os = arg_parser()
+    file, sw_proj_name, build_cfg, pc_name, host_os, timestamp, force_write, templates = arg_parser()
  
     # Create
-    build_info_str = create_build_info(sw_proj_name, build_cfg, pc_name, host_os)
+    git_info        = get_git_info()
+    build_info_str  = create_build_info(sw_proj_name, build_cfg, pc_name, host_os, git_info)
+    fields          = create_template_fields(build_info_str, sw_proj_name, build_cfg, pc_name, host_os, git_info, timestamp)
 
     # Write to file
-    write_proj_info(file, build_info_str)
+    written = write_proj_info(file, fields, force_write, templates)
 
     print("")
     print("====================================================================")
     print("     PROJECT INFO GENERATOR %s" % SCRIPT_VER )
     print("====================================================================")
-    print("Project information successfully generated!\n")
+    if written:
+        print("Project information successfully generated!\n")
+    else:
+        print("Project information unchanged, files not written!\n")
 
 # ===============================================================================
 #       CLASSES
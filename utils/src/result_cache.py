@@ -0,0 +1,231 @@
+# ===============================================================================
+# @file:    result_cache.py
+# @note:    On-disk cache of image analysis results
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Results are stored in SQLite database and looked up by file
+#           path, size and modification time. When file was touched or
+#           copied, lookup falls back to hash of file content. Least
+#           recently used entries are evicted above size limit.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import os
+import time
+import json
+import hashlib
+import sqlite3
+
+# ===============================================================================
+#       CACHE SETTINGS
+# ===============================================================================
+
+# Cache database file name
+CACHE_DB_FILE = "hex_analyzer_cache.sqlite"
+
+# Max. number of cached results
+CACHE_MAX_ENTRIES = 100000
+
+# Number of database changes between commits
+CACHE_COMMIT_INTERVAL = 256
+
+# Size of chunk for content hash calculation
+# Unit: byte
+CACHE_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Database schema
+CACHE_DB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path            TEXT NOT NULL,
+    params          TEXT NOT NULL,
+    size            INTEGER NOT NULL,
+    mtime_ns        INTEGER NOT NULL,
+    content_hash    TEXT NOT NULL,
+    result          TEXT NOT NULL,
+    last_used       REAL NOT NULL,
+    PRIMARY KEY ( path, params )
+);
+CREATE INDEX IF NOT EXISTS results_content ON results ( content_hash, params );
+CREATE INDEX IF NOT EXISTS results_size ON results ( size, params );
+CREATE INDEX IF NOT EXISTS results_last_used ON results ( last_used );
+"""
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Calculate hash of file content
+#
+# @param[in]:    path   - File path
+# @return:       SHA256 of file content as hex string
+# ===============================================================================
+def calc_file_hash(path):
+    sha = hashlib.sha256()
+
+    with open( path, "rb" ) as f:
+        for chunk in iter( lambda: f.read( CACHE_HASH_CHUNK_SIZE ), b"" ):
+            sha.update( chunk )
+
+    return sha.hexdigest()
+
+# ===============================================================================
+# @brief: Get file state used by result cache
+#
+#       Meant to be called where file is analyzed (e.g. worker process), so
+#       content hash is not calculated serially on store.
+#
+# @param[in]:    path   - File path
+# @return:       Tuple of (size, modification time, content hash)
+# ===============================================================================
+def calc_file_state(path):
+    st = os.stat( path )
+    return st.st_size, st.st_mtime_ns, calc_file_hash( path )
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Image analysis result cache
+#
+#       "params" identifies analysis settings (addresses, tool version...),
+#       results of different settings are cached separately.
+# ===============================================================================
+class ResultCache:
+
+    def __init__(self, cache_dir, max_entries=CACHE_MAX_ENTRIES):
+        os.makedirs( cache_dir, exist_ok=True )
+
+        self.max_entries    = max_entries
+        self._db            = sqlite3.connect( os.path.join( cache_dir, CACHE_DB_FILE ), timeout=30 )
+        self._db.execute( "PRAGMA journal_mode=WAL" )
+        self._db.execute( "PRAGMA synchronous=NORMAL" )
+        self._db.executescript( CACHE_DB_SCHEMA )
+
+        # Number of uncommitted changes
+        self._changes = 0
+
+        # Content hashes calculated during lookup, reused on store
+        self._hashes = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.evict()
+        self._db.commit()
+        self._db.close()
+
+    # ===============================================================================
+    # @brief: Commit changes in batches
+    #
+    # @return:       void
+    # ===============================================================================
+    def _changed(self):
+        self._changes += 1
+        if self._changes >= CACHE_COMMIT_INTERVAL:
+            self._db.commit()
+            self._changes = 0
+
+    # ===============================================================================
+    # @brief: Get cached result
+    #
+    #       Content hash is calculated only when result of same sized file
+    #       exists. Result found by content hash belongs to other file, its
+    #       "file" field is replaced with requested path.
+    #
+    # @param[in]:    path   - Image file path
+    # @param[in]:    params - Analysis settings string
+    # @return:       Cached result or None (also when file can not be read)
+    # ===============================================================================
+    def get(self, path, params):
+        file    = path
+        path    = os.path.abspath( path )
+
+        try:
+            st = os.stat( path )
+        except OSError:
+            return None
+
+        row = self._db.execute( "SELECT size, mtime_ns, result FROM results WHERE path = ? AND params = ?", ( path, params )).fetchone()
+
+        # Fast path, file not changed
+        if row is not None and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+            self._db.execute( "UPDATE results SET last_used = ? WHERE path = ? AND params = ?", ( time.time(), path, params ))
+            self._changed()
+            return json.loads( row[2] )
+
+        # Fallback to content hash, only same sized files can match
+        if self._db.execute( "SELECT 1 FROM results WHERE size = ? AND params = ? LIMIT 1", ( st.st_size, params )).fetchone() is None:
+            return None
+
+        try:
+            content_hash = calc_file_hash( path )
+        except OSError:
+            return None
+
+        self._hashes[path] = ( st.st_size, st.st_mtime_ns, content_hash )
+
+        row = self._db.execute( "SELECT result FROM results WHERE content_hash = ? AND params = ?", ( content_hash, params )).fetchone()
+        if row is not None:
+            result = json.loads( row[0] )
+            if "file" in result:
+                result["file"] = file
+
+            self.put( path, params, result )
+            return result
+
+        return None
+
+    # ===============================================================================
+    # @brief: Store result
+    #
+    #       File state shall be taken before analysis. Result is not stored
+    #       when file changed since then, as it may describe old content.
+    #
+    # @param[in]:    path   - Image file path
+    # @param[in]:    params - Analysis settings string
+    # @param[in]:    result - JSON serializable result
+    # @param[in]:    state  - File state from "calc_file_state", None to use state from "get" or calculate it
+    # @return:       void
+    # ===============================================================================
+    def put(self, path, params, result, state=None):
+        path        = os.path.abspath( path )
+        get_state   = self._hashes.pop( path, None )
+
+        try:
+            state   = state or get_state or calc_file_state( path )
+            st      = os.stat( path )
+        except OSError:
+            return
+
+        size, mtime_ns, content_hash = state
+        if size != st.st_size or mtime_ns != st.st_mtime_ns:
+            return
+
+        self._db.execute( "INSERT OR REPLACE INTO results VALUES ( ?, ?, ?, ?, ?, ?, ? )",
+                          ( path, params, st.st_size, st.st_mtime_ns, content_hash, json.dumps( result ), time.time() ))
+        self._changed()
+
+    # ===============================================================================
+    # @brief: Evict least recently used results above size limit
+    #
+    # @return:       void
+    # ===============================================================================
+    def evict(self):
+        count = self._db.execute( "SELECT COUNT(*) FROM results" ).fetchone()[0]
+
+        if count > self.max_entries:
+            self._db.execute( "DELETE FROM results WHERE rowid IN ( SELECT rowid FROM results ORDER BY last_used LIMIT ? )", ( count - self.max_entries, ))
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,148 @@
+# ===============================================================================
+# @file:    revision.py
+# @note:    Single entry point of Revision utility tools
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Dispatches subcommand to matching tool. Tool modules are
+#           imported only when their subcommand is invoked, so start-up
+#           time of each invocation includes only what is actually used.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import sys
+
+# ===============================================================================
+#       SCRIPT VERSIONING
+# ===============================================================================
+SCRIPT_VER = "V0.1.0"
+
+# ------------------------------------------------------------------------
+#   Subcommands
+#
+#   Format: name: ( tool module, injected arguments, description )
+# ------------------------------------------------------------------------
+COMMANDS = {
+    "analyze"       : ( "hex_analyzer",     [],         None,   "decode image header and project info" ),
+    "build-info"    : ( "hex_analyzer",     [],         "-ba",  "decode project info (-ba addr)" ),
+    "verify"        : ( "hex_analyzer",     [ "-vf" ],  None,   "verify image CRC, hash and signature" ),
+    "diff"          : ( "hex_analyzer",     [],         "-df",  "compare two images (-df file)" ),
+    "stamp"         : ( "image_stamp",      [],         None,   "fill post-build image header fields" ),
+    "scan"          : ( "image_scan",       [],         None,   "analyze image archive" ),
+    "watch"         : ( "image_watch",      [],         None,   "analyze images as they are written" ),
+    "proj-info"     : ( "proj_info",        [],         None,   "generate project info source files" ),
+}
+
+# Arguments not requiring command specific option
+HELP_ARGS = ( "-h", "--help", "-v", "--version" )
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Print usage
+#
+# @return:       void
+# ===============================================================================
+def print_usage():
+    print("usage: revision.py [-h] [-v] [--timings[=report_file]] [--profile=profile_file] <command> [args]")
+    print("")
+    print("Revision Utility Tools %s" % SCRIPT_VER)
+    print("")
+    print("commands:")
+    for name, ( _, _, _, description ) in COMMANDS.items():
+        print("  %-14s%s" % ( name, description ))
+    print("")
+    print("Use \"revision.py <command> -h\" for command arguments.")
+    print("")
+    print("options:")
+    print("  --timings[=report_file]   report phase timings to stderr or append JSON line to file")
+    print("  --profile=profile_file    dump cProfile statistics to file")
+    print("")
+    print("Enjoy the program!")
+
+# ===============================================================================
+# @brief: Run subcommand
+#
+#       Tool sees its own arguments as if invoked directly. Commands which
+#       differ from "analyze" only by option require that option.
+#
+# @param[in]:    name   - Subcommand name
+# @param[in]:    args   - Subcommand arguments
+# @return:       void
+# ===============================================================================
+def run_command(name, args):
+    module_name, injected, required, _ = COMMANDS[name]
+
+    if required is not None and not any( arg in HELP_ARGS for arg in args ):
+        if not any( arg == required or arg.startswith( required + "=" ) for arg in args ):
+            sys.exit( "ERROR: revision.py %s: option %s is required" % ( name, required ))
+
+    module = __import__( module_name )
+
+    sys.argv = [ "revision.py %s" % name ] + injected + args
+    module.main()
+
+# ===============================================================================
+# @brief: Parse timing options preceding subcommand
+#
+#       Timings are enabled only when requested, so "timings" module is
+#       not imported otherwise.
+#
+# @param[in]:    args   - Invocation arguments
+# @return:       Remaining arguments
+# ===============================================================================
+def parse_timing_options(args):
+    report_file     = None
+    profile_file    = None
+
+    while args and args[0].startswith(( "--timings", "--profile" )):
+        option, _, value = args[0].partition( "=" )
+        args = args[1:]
+
+        if option == "--timings":
+            report_file = value or "1"
+        elif option == "--profile" and value:
+            profile_file = value
+        else:
+            sys.exit( "Invalid option: %s" % option )
+
+    if report_file is not None or profile_file is not None:
+        import timings
+        timings.enable( report_file, profile_file )
+
+    return args
+
+# ===============================================================================
+# @brief:   Main entry
+#
+# @return:       void
+# ===============================================================================
+def main():
+    args = parse_timing_options( sys.argv[1:] )
+
+    if not args or args[0] in ( "-h", "--help" ):
+        print_usage()
+
+    elif args[0] in ( "-v", "--version" ):
+        print("Script version: %s" % SCRIPT_VER)
+
+    elif args[0] in COMMANDS:
+        run_command( args[0], args[1:] )
+
+    else:
+        print_usage()
+        sys.exit( "\nUnknown command: %s" % args[0] )
+
+# ===============================================================================
+#       MAIN ENTRY
+# ===============================================================================
+if __name__ == "__main__":
+    main()
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,213 @@
+# ===============================================================================
+# @file:    timings.py
+# @note:    Timing and profiling instrumentation of utility tools
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Records wall time of tool phases (git calls, file writes, image
+#           load, header decode, hashing) and reports them at exit.
+#           Enabled with REVISION_TIMINGS environment variable (or
+#           "revision.py --timings"), otherwise every phase is shared
+#           no-op context manager.
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import os
+import sys
+import time
+
+# ===============================================================================
+#       TIMINGS SETTINGS
+# ===============================================================================
+
+# Environment variable enabling timings: "1" prints report to stderr,
+# otherwise value is file to which JSON report line is appended
+TIMINGS_ENV = "REVISION_TIMINGS"
+
+# Environment variable enabling cProfile, value is profile dump file
+PROFILE_ENV = "REVISION_PROFILE"
+
+# Value of TIMINGS_ENV reporting to stderr
+TIMINGS_STDERR = "1"
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Get phase context manager
+#
+# @param[in]:    name   - Phase name
+# @return:       Context manager measuring phase, no-op when timings disabled
+# ===============================================================================
+def phase(name):
+    if _timings is None:
+        return _NULL_PHASE
+
+    return Phase( _timings, name )
+
+# ===============================================================================
+# @brief: Enable timings
+#
+#       Report (and profile dump) is written at interpreter exit.
+#
+# @param[in]:    report_file    - Report file, TIMINGS_STDERR for stderr, None for no report
+# @param[in]:    profile_file   - cProfile dump file, None if not used
+# @return:       void
+# ===============================================================================
+def enable(report_file=None, profile_file=None):
+    global _timings
+    import atexit
+
+    if _timings is None:
+        _timings = Timings( report_file, profile_file )
+        atexit.register( _timings.report )
+
+# ===============================================================================
+# @brief: Check if timings are enabled
+#
+# @return:       True if timings are enabled
+# ===============================================================================
+def is_enabled():
+    return _timings is not None
+
+
+# ===============================================================================
+#       CLASSES
+# ===============================================================================
+
+# ===============================================================================
+# @brief: No-op phase, used when timings are disabled
+# ===============================================================================
+class NullPhase:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+# ===============================================================================
+# @brief: Measured phase
+# ===============================================================================
+class Phase:
+
+    def __init__(self, timings, name):
+        self.timings    = timings
+        self.name       = name
+        self.start      = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.add( self.name, time.perf_counter() - self.start )
+        return False
+
+# ===============================================================================
+# @brief: Phase timings of single tool invocation
+#
+#       Phases with same name are accumulated. Phases may be nested (e.g.
+#       hashing inside verification) and measured from multiple threads.
+# ===============================================================================
+class Timings:
+
+    def __init__(self, report_file=None, profile_file=None):
+        import threading
+
+        self.report_file    = report_file
+        self.profile_file   = profile_file
+        self.start          = time.perf_counter()
+
+        # Phase name: [ count, total time, max. time ]
+        self.phases         = {}
+        self._lock          = threading.Lock()
+
+        self._profile = None
+        if profile_file:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    # ===============================================================================
+    # @brief: Add measured phase
+    #
+    # @param[in]:    name       - Phase name
+    # @param[in]:    elapsed    - Phase wall time
+    # @return:       void
+    # ===============================================================================
+    def add(self, name, elapsed):
+        with self._lock:
+            stats = self.phases.setdefault( name, [ 0, 0.0, 0.0 ])
+            stats[0] += 1
+            stats[1] += elapsed
+            stats[2] = max( stats[2], elapsed )
+
+    # ===============================================================================
+    # @brief: Get structured report
+    #
+    # @return:       Dictionary of invocation and phase timings, times in seconds
+    # ===============================================================================
+    def to_dict(self):
+        with self._lock:
+            phases = { name: { "count": count, "total": total, "max": max_time } for name, ( count, total, max_time ) in self.phases.items() }
+
+        return {
+            "command"   : " ".join( sys.argv ),
+            "pid"       : os.getpid(),
+            "total"     : time.perf_counter() - self.start,
+            "phases"    : phases,
+        }
+
+    # ===============================================================================
+    # @brief: Write report and profile dump
+    #
+    # @return:       void
+    # ===============================================================================
+    def report(self):
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats( self.profile_file )
+
+        # Only profile requested
+        if not self.report_file:
+            return
+
+        report = self.to_dict()
+
+        if self.report_file != TIMINGS_STDERR:
+            import json
+            with open( self.report_file, "a" ) as f:
+                f.write( json.dumps( report ) + "\n" )
+            return
+
+        sys.stderr.write("\nTimings of <%s>:\n" % report["command"])
+        for name, stats in sorted( report["phases"].items(), key=lambda item: -item[1]["total"] ):
+            sys.stderr.write(" -%-16s%9.2f ms (%d x, max. %.2f ms)\n" % ( name, stats["total"] * 1e3, stats["count"], stats["max"] * 1e3 ))
+        sys.stderr.write(" -%-16s%9.2f ms\n" % ( "total", report["total"] * 1e3 ))
+
+
+# ===============================================================================
+#       MODULE STATE
+# ===============================================================================
+
+# Shared no-op phase
+_NULL_PHASE = NullPhase()
+
+# Timings of current process, None when disabled
+_timings = None
+
+# Enabled only in main process, worker processes inherit environment
+# (and re-import this module when spawned) but must not report
+if os.environ.get( TIMINGS_ENV ) or os.environ.get( PROFILE_ENV ):
+    import multiprocessing
+
+    if multiprocessing.current_process().name == "MainProcess":
+        enable( os.environ.get( TIMINGS_ENV ), os.environ.get( PROFILE_ENV ))
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================
@@ -0,0 +1,81 @@
+# ===============================================================================
+# @file:    test_startup.py
+# @note:    Start-up time check of utility tools entry point
+# @author:  Ziga Miklosic
+# @date:    17.10.2026
+# @brief:   Measures start-up time of "revision.py" commands on top of bare
+#           interpreter start-up, so check does not depend on machine speed
+#           of interpreter itself. Run with "python -m pytest utils/tests".
+# ===============================================================================
+
+# ===============================================================================
+#       IMPORTS
+# ===============================================================================
+import os
+import sys
+import time
+import subprocess
+
+import pytest
+
+# ===============================================================================
+#       TEST SETTINGS
+# ===============================================================================
+
+# Entry point of utility tools
+REVISION_PY = os.path.join( os.path.dirname( os.path.abspath( __file__ )), "..", "src", "revision.py" )
+
+# Measured commands, each imports only tool of its command
+STARTUP_COMMANDS = ( [ "--version" ], [ "analyze", "-v" ], [ "stamp", "-h" ], [ "proj-info", "-h" ] )
+
+# Max. start-up time of single command above bare interpreter start-up
+# Unit: s
+STARTUP_MARGIN = 0.1
+
+# Number of repetitions, best time is used
+STARTUP_REPEAT = 5
+
+
+# ===============================================================================
+#       FUNCTIONS
+# ===============================================================================
+
+# ===============================================================================
+# @brief: Measure best wall time of command
+#
+# @param[in]:    cmd    - Command
+# @return:       Best wall time in seconds
+# ===============================================================================
+def measure(cmd):
+    best = None
+
+    for _ in range( STARTUP_REPEAT ):
+        start = time.perf_counter()
+        subprocess.run( cmd, check=True, stdout=subprocess.DEVNULL )
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min( best, elapsed )
+
+    return best
+
+
+# ===============================================================================
+#       TESTS
+# ===============================================================================
+
+@pytest.mark.parametrize( "args", STARTUP_COMMANDS, ids=lambda args: " ".join( args ))
+def test_startup_time(args):
+    interpreter = measure([ sys.executable, "-c", "pass" ])
+    command     = measure([ sys.executable, REVISION_PY ] + args )
+
+    assert command - interpreter < STARTUP_MARGIN, "start-up of \"%s\" took %.1f ms over interpreter" % ( " ".join( args ), ( command - interpreter ) * 1e3 )
+
+@pytest.mark.parametrize( "name, option", [ ( "build-info", "-ba" ), ( "diff", "-df" ) ])
+def test_command_requires_option(name, option):
+    proc = subprocess.run([ sys.executable, REVISION_PY, name, "-f", "image.hex" ], capture_output=True, text=True )
+
+    assert proc.returncode != 0
+    assert option in proc.stderr
+
+# ===============================================================================
+#       END OF FILE
+# ===============================================================================